@@ -96,7 +96,8 @@ def build_parser():
                         help='use CuDNN benchmark mode')
     parser.add_argument("--train_dtype", default="float32",
                         choices=["float16", "float32", "float64", "O0", "O1", "O2", "O3"],
-                        help="Data type for training")
+                        help="Data type for training. float16 enables native mixed precision training "
+                             "(torch.cuda.amp) and O0-O3 enable apex.")
     parser.add_argument('--model_save_dir', type=str, default=False,
                         help='directory to save a model')
     parser.add_argument('--resume', type=str, default=False, nargs='?',
@@ -159,6 +160,10 @@ def build_parser():
                         help='minimum number of input frames')
     parser.add_argument('--dynamic_batching', type=strtobool, default=True,
                         help='')
+    parser.add_argument('--feat_cache_dir', type=str, default=False, nargs='?',
+                        help='directory to cache input features as memory-mapped .npy files')
+    parser.add_argument('--n_workers', type=int, default=1,
+                        help='number of threads to load input features in parallel')
     parser.add_argument('--input_noise_std', type=float, default=0,
                         help='standard deviation of Gaussian noise to input features')
     parser.add_argument('--weight_noise_std', type=float, default=0,
@@ -354,6 +359,8 @@ def build_parser():
                         help='print to standard output during evaluation')
     parser.add_argument('--recog_n_gpus', type=int, default=0,
                         help='number of GPUs (0 indicates CPU)')
+    parser.add_argument('--recog_quantize', type=strtobool, default=False,
+                        help='quantize linear and LSTM layers to int8 dynamically for CPU inference')
     parser.add_argument('--recog_sets', type=str, default=[], nargs='+',
                         help='tsv file paths for the evaluation sets')
     parser.add_argument('--recog_first_n_utt', type=int, default=-1,
@@ -373,7 +380,8 @@ def build_parser():
     parser.add_argument('--recog_oracle', type=strtobool, default=False,
                         help='recognize by teacher-forcing')
     parser.add_argument('--recog_batch_size', type=int, default=1,
-                        help='size of mini-batch in evaluation')
+                        help='size of mini-batch in evaluation. Utterances are sorted by length and '
+                             'encoded in parallel, while beam search is performed per utterance.')
     parser.add_argument('--recog_beam_width', type=int, default=1,
                         help='size of beam')
     parser.add_argument('--recog_max_len_ratio', type=float, default=1.0,
@@ -392,6 +400,9 @@ def build_parser():
                         help='adopt Google NMT beam search decoding')
     parser.add_argument('--recog_eos_threshold', type=float, default=1.5,
                         help='threshold for emitting a EOS token')
+    parser.add_argument('--recog_beam_threshold', type=float, default=0.0,
+                        help='prune hypotheses whose scores are lower than the best one by more than this value '
+                             'at every step (disabled if 0)')
     parser.add_argument('--recog_lm_weight', type=float, default=0.0,
                         help='weight of fisrt-path LM score')
     parser.add_argument('--recog_lm_second_weight', type=float, default=0.0,
@@ -46,6 +46,13 @@ def main():
     ppl_avg, loss_avg = 0, 0
     acc_avg = 0
     bleu_avg = 0
+
+    # Gather utterances of similar lengths for batch decoding
+    # NOTE: keep the original order when states are carried over between utterances
+    sort_by = 'utt_id'
+    if args.recog_batch_size > 1 and not (args.recog_asr_state_carry_over or args.recog_lm_state_carry_over):
+        sort_by = 'input'
+
     for i, s in enumerate(args.recog_sets):
         # Load dataset
         dataset = Dataset(corpus=args.corpus,
@@ -64,7 +71,10 @@ def main():
                           unit_sub2=args.unit_sub2,
                           batch_size=args.recog_batch_size,
                           first_n_utterances=args.recog_first_n_utt,
-                          is_test=True)
+                          sort_by=sort_by,
+                          is_test=True,
+                          feat_cache_dir=args.feat_cache_dir,
+                          n_workers=args.n_workers)
 
         if i == 0:
             # Load the ASR model
@@ -92,6 +102,8 @@ def main():
                     load_checkpoint(recog_model_e, model_e)
                     if args.recog_n_gpus >= 1:
                         model_e.cuda()
+                    elif args.recog_quantize:
+                        model_e.quantize()
                     ensemble_models += [model_e]
 
             # Load the LM for shallow fusion
@@ -168,6 +180,8 @@ def main():
             if args.recog_n_gpus >= 1:
                 model.cudnn_setting(deterministic=True, benchmark=False)
                 model.cuda()
+            elif args.recog_quantize:
+                model.quantize()
 
         start_time = time.time()
 
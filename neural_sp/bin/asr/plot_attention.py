@@ -7,6 +7,8 @@
 """Plot attention weights of the attention model."""
 
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import copy
 import logging
 import os
@@ -51,7 +53,9 @@ def main():
                           unit=args.unit,
                           unit_sub1=args.unit_sub1,
                           batch_size=args.recog_batch_size,
-                          is_test=True)
+                          is_test=True,
+                          feat_cache_dir=args.feat_cache_dir,
+                          n_workers=args.n_workers)
 
         if i == 0:
             # Load the ASR model
@@ -77,6 +81,8 @@ def main():
                     load_checkpoint(recog_model_e, model_e)
                     if args.recog_n_gpus >= 1:
                         model_e.cuda()
+                    elif args.recog_quantize:
+                        model_e.quantize()
                     ensemble_models += [model_e]
 
             # Load the LM for shallow fusion
@@ -124,6 +130,8 @@ def main():
             if args.recog_n_gpus >= 1:
                 model.cudnn_setting(deterministic=True, benchmark=False)
                 model.cuda()
+            elif args.recog_quantize:
+                model.quantize()
 
         save_path = mkdir_join(args.recog_dir, 'att_weights')
 
@@ -132,12 +140,18 @@ def main():
             shutil.rmtree(save_path)
             os.mkdir(save_path)
 
+        # NOTE: render figures in worker processes so that decoding is not blocked by matplotlib
+        n_workers = max(1, os.cpu_count() // 2)
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+        futures = deque()
+
         while True:
             batch, is_new_epoch = dataset.next(recog_params['recog_batch_size'])
             best_hyps_id, aws = model.decode(
                 batch['xs'], recog_params, dataset.idx2token[0],
                 exclude_eos=False,
                 refs_id=batch['ys'],
+                utt_ids=batch['utt_ids'],
                 ensemble_models=ensemble_models[1:] if len(ensemble_models) > 1 else [],
                 speakers=batch['sessions'] if dataset.corpus == 'swbd' else batch['speakers'])
 
@@ -145,7 +159,8 @@ def main():
             ctc_probs, topk_ids = None, None
             if args.ctc_weight > 0:
                 ctc_probs, topk_ids, xlens = model.get_ctc_probs(
-                    batch['xs'], temperature=1, topk=min(100, model.vocab))
+                    batch['xs'], temperature=1, topk=min(100, model.vocab),
+                    utt_ids=batch['utt_ids'])
                 # NOTE: ctc_probs: '[B, T, topk]'
 
             if model.bwd_weight > 0.5:
@@ -157,14 +172,18 @@ def main():
                 tokens = dataset.idx2token[0](best_hyps_id[b], return_list=True)
                 spk = batch['speakers'][b]
 
-                plot_attention_weights(
+                futures.append(executor.submit(
+                    plot_attention_weights,
                     aws[b][:, :len(tokens)], tokens,
                     spectrogram=batch['xs'][b][:, :dataset.input_dim] if args.input_type == 'speech' else None,
                     ref=batch['text'][b].lower(),
                     save_path=mkdir_join(save_path, spk, batch['utt_ids'][b] + '.png'),
                     figsize=(20, 8),
                     ctc_probs=ctc_probs[b, :xlens[b]] if ctc_probs is not None else None,
-                    ctc_topk_ids=topk_ids[b] if topk_ids is not None else None)
+                    ctc_topk_ids=topk_ids[b] if topk_ids is not None else None))
+                # Bound the number of pending figures to limit memory usage
+                while len(futures) > n_workers * 2:
+                    futures.popleft().result()
 
                 if model.bwd_weight > 0.5:
                     hyp = ' '.join(tokens[::-1])
@@ -178,6 +197,10 @@ def main():
             if is_new_epoch:
                 break
 
+        for future in futures:
+            future.result()
+        executor.shutdown()
+
 
 if __name__ == '__main__':
     main()
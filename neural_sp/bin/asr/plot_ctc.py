@@ -47,7 +47,9 @@ def main():
                           unit=args.unit,
                           unit_sub1=args.unit_sub1,
                           batch_size=args.recog_batch_size,
-                          is_test=True)
+                          is_test=True,
+                          feat_cache_dir=args.feat_cache_dir,
+                          n_workers=args.n_workers)
 
         if i == 0:
             # Load the ASR model
@@ -71,6 +73,8 @@ def main():
             if args.recog_n_gpus >= 1:
                 model.cudnn_setting(deterministic=True, benchmark=False)
                 model.cuda()
+            elif args.recog_quantize:
+                model.quantize()
 
         save_path = mkdir_join(args.recog_dir, 'ctc_probs')
 
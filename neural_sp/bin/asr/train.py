@@ -7,6 +7,7 @@
 """Train the ASR model."""
 
 import argparse
+from contextlib import contextmanager
 import copy
 import cProfile
 import logging
@@ -29,6 +30,7 @@ from neural_sp.bin.train_utils import (
     set_save_path
 )
 from neural_sp.datasets.asr import Dataset
+from neural_sp.datasets.prefetcher import Prefetcher
 from neural_sp.models.data_parallel import CustomDataParallel
 from neural_sp.models.data_parallel import CPUWrapperASR
 from neural_sp.models.lm.build import build_lm
@@ -91,7 +93,10 @@ def main():
                         subsample_factor=args.subsample_factor,
                         subsample_factor_sub1=args.subsample_factor_sub1,
                         subsample_factor_sub2=args.subsample_factor_sub2,
-                        discourse_aware=args.discourse_aware)
+                        discourse_aware=args.discourse_aware,
+                        feat_cache_dir=args.feat_cache_dir,
+                        n_workers=args.n_workers,
+                        seed=1)
     dev_set = Dataset(corpus=args.corpus,
                       tsv_path=args.dev_set,
                       tsv_path_sub1=args.dev_set_sub1,
@@ -114,7 +119,10 @@ def main():
                       ctc_sub2=args.ctc_weight_sub2 > 0,
                       subsample_factor=args.subsample_factor,
                       subsample_factor_sub1=args.subsample_factor_sub1,
-                      subsample_factor_sub2=args.subsample_factor_sub2)
+                      subsample_factor_sub2=args.subsample_factor_sub2,
+                      feat_cache_dir=args.feat_cache_dir,
+                      n_workers=args.n_workers,
+                      seed=2)
     eval_sets = [Dataset(corpus=args.corpus,
                          tsv_path=s,
                          dict_path=args.dict,
@@ -122,7 +130,8 @@ def main():
                          unit=args.unit,
                          wp_model=args.wp_model,
                          batch_size=1,
-                         is_test=True) for s in args.eval_sets]
+                         is_test=True,
+                         feat_cache_dir=args.feat_cache_dir) for s in args.eval_sets]
 
     args.vocab = train_set.vocab
     args.vocab_sub1 = train_set.vocab_sub1
@@ -263,6 +272,7 @@ def main():
     # GPU setting
     use_apex = args.train_dtype in ["O0", "O1", "O2", "O3"]
     amp = None
+    scaler = None
     if args.n_gpus >= 1:
         model.cudnn_setting(deterministic=not (is_transformer or args.cudnn_benchmark),
                             benchmark=args.cudnn_benchmark)
@@ -279,6 +289,12 @@ def main():
             amp.init()
             if args.resume:
                 load_checkpoint(args.resume, amp=amp)
+        elif args.train_dtype == 'float16':
+            # NOTE: native mixed precision training
+            assert hasattr(torch.cuda, 'amp'), 'PyTorch >= 1.6 is required for --train_dtype float16.'
+            scaler = torch.cuda.amp.GradScaler()
+            if args.resume:
+                load_checkpoint(args.resume, scaler=scaler)
         model = CustomDataParallel(model, device_ids=list(range(0, args.n_gpus)))
 
         if teacher is not None:
@@ -321,13 +337,22 @@ def main():
     start_time_epoch = time.time()
     start_time_step = time.time()
     pbar_epoch = tqdm(total=len(train_set))
+    # NOTE: the progress bar is updated every print_step to reduce I/O
+    n_utts_pbar = 0
     accum_n_steps = 0
     n_steps = optimizer.n_steps * args.accum_grad_n_steps
     epoch_detail_prev = 0
     session_prev = None
+    # NOTE: load the next dev mini-batch in the background so that the dev loss
+    # computation does not block the training loop with feature loading
+    dev_loader = Prefetcher(dev_set, batch_size=1 if 'transducer' in args.dec_type else None)
+    # NOTE: load training mini-batches in the background while the model is updated
+    # NOTE: padded inputs are kept as np.ndarray for multiple GPUs because tensors are
+    # scattered over GPUs while the other inputs in the mini-batch are replicated
+    train_loader = Prefetcher(train_set, max_size=2, pin_memory=args.n_gpus == 1)
     while True:
         # Compute loss in the training set
-        batch_train, is_new_epoch = train_set.next()
+        batch_train, is_new_epoch, epoch_detail = train_loader.next()
         if args.discourse_aware and batch_train['sessions'][0] != session_prev:
             model.module.reset_session()
         session_prev = batch_train['sessions'][0]
@@ -337,28 +362,33 @@ def main():
         if accum_n_steps == 1:
             loss_train = 0  # moving average over gradient accumulation
         for task in tasks:
-            loss, observation = model(batch_train, task,
-                                      teacher=teacher, teacher_lm=teacher_lm)
+            with autocast(enabled=scaler is not None):
+                loss, observation = model(batch_train, task,
+                                          teacher=teacher, teacher_lm=teacher_lm)
             reporter.add(observation)
             if use_apex:
                 with amp.scale_loss(loss, optimizer.optimizer) as scaled_loss:
                     scaled_loss.backward()
+            elif scaler is not None:
+                scaler.scale(loss).backward()
             else:
                 loss.backward()
             loss.detach()  # Trancate the graph
             loss_train = (loss_train * (accum_n_steps - 1) + loss.item()) / accum_n_steps
             if accum_n_steps >= args.accum_grad_n_steps or is_new_epoch:
                 if args.clip_grad_norm > 0:
+                    if scaler is not None:
+                        scaler.unscale_(optimizer.optimizer)
                     total_norm = torch.nn.utils.clip_grad_norm_(
                         model.module.parameters(), args.clip_grad_norm)
                     reporter.add_tensorboard_scalar('total_norm', total_norm)
-                optimizer.step()
+                optimizer.step(scaler=scaler)
                 optimizer.zero_grad()
                 accum_n_steps = 0
                 # NOTE: parameters are forcibly updated at the end of every epoch
             del loss
 
-        pbar_epoch.update(len(batch_train['utt_ids']))
+        n_utts_pbar += len(batch_train['utt_ids'])
         reporter.add_tensorboard_scalar('learning_rate', optimizer.lr)
         # NOTE: loss/acc/ppl are already added in the model
         reporter.step()
@@ -366,26 +396,30 @@ def main():
         # NOTE: n_steps is different from the step counter in Noam Optimizer
 
         if n_steps % args.print_step == 0:
+            pbar_epoch.update(n_utts_pbar)
+            n_utts_pbar = 0
+
             # Compute loss in the dev set
-            batch_dev = dev_set.next(batch_size=1 if 'transducer' in args.dec_type else None)[0]
+            batch_dev = dev_loader.next()[0]
             # Change mini-batch depending on task
+            # NOTE: keep the loss on the device, and read the value only once for logging
             for task in tasks:
                 loss, observation = model(batch_dev, task, is_eval=True)
                 reporter.add(observation, is_eval=True)
-                loss_dev = loss.item()
+                loss_dev = loss.detach()
                 del loss
             reporter.step(is_eval=True)
 
             duration_step = time.time() - start_time_step
             if args.input_type == 'speech':
-                xlen = max(len(x) for x in batch_train['xs'])
-                ylen = max(len(y) for y in batch_train['ys'])
+                xlen = batch_train['max_xlen']
+                ylen = batch_train['max_ylen']
             elif args.input_type == 'text':
-                xlen = max(len(x) for x in batch_train['ys'])
+                xlen = batch_train['max_ylen']
                 ylen = max(len(y) for y in batch_train['ys_sub1'])
             logger.info("step:%d(ep:%.2f) loss:%.3f(%.3f)/lr:%.7f/bs:%d/xlen:%d/ylen:%d (%.2f min)" %
-                        (n_steps, optimizer.n_epochs + train_set.epoch_detail,
-                         loss_train, loss_dev,
+                        (n_steps, optimizer.n_epochs + epoch_detail,
+                         loss_train, loss_dev.item(),
                          optimizer.lr, len(batch_train['utt_ids']),
                          xlen, ylen, duration_step / 60))
             start_time_step = time.time()
@@ -398,18 +432,20 @@ def main():
 
         # Ealuate model every 0.1 epoch during MBR training
         if args.mbr_training:
-            if int(train_set.epoch_detail * 10) != int(epoch_detail_prev * 10):
+            if int(epoch_detail * 10) != int(epoch_detail_prev * 10):
                 # dev
-                evaluate([model.module], dev_set, recog_params, args,
-                         int(train_set.epoch_detail * 10) / 10, logger)
+                evaluate([model.module], dev_loader.snapshot(), recog_params, args,
+                         int(epoch_detail * 10) / 10, logger)
                 # Save the model
                 optimizer.save_checkpoint(
                     model, save_path, remove_old=False, amp=amp,
-                    epoch_detail=train_set.epoch_detail)
-            epoch_detail_prev = train_set.epoch_detail
+                    epoch_detail=epoch_detail, scaler=scaler)
+            epoch_detail_prev = epoch_detail
 
         # Save checkpoint and evaluate model per epoch
         if is_new_epoch:
+            pbar_epoch.update(n_utts_pbar)
+            n_utts_pbar = 0
             duration_epoch = time.time() - start_time_epoch
             logger.info('========== EPOCH:%d (%.2f min) ==========' %
                         (optimizer.n_epochs + 1, duration_epoch / 60))
@@ -420,11 +456,11 @@ def main():
 
                 # Save the model
                 optimizer.save_checkpoint(
-                    model, save_path, remove_old=not is_transformer, amp=amp)
+                    model, save_path, remove_old=not is_transformer, amp=amp, scaler=scaler)
             else:
                 start_time_eval = time.time()
                 # dev
-                metric_dev = evaluate([model.module], dev_set, recog_params, args,
+                metric_dev = evaluate([model.module], dev_loader.snapshot(), recog_params, args,
                                       optimizer.n_epochs + 1, logger)
                 optimizer.epoch(metric_dev)  # lr decay
                 reporter.epoch(metric_dev, name=args.metric)  # plot
@@ -432,7 +468,7 @@ def main():
                 if optimizer.is_topk or is_transformer:
                     # Save the model
                     optimizer.save_checkpoint(
-                        model, save_path, remove_old=not is_transformer, amp=amp)
+                        model, save_path, remove_old=not is_transformer, amp=amp, scaler=scaler)
 
                     # test
                     if optimizer.is_topk:
@@ -472,6 +508,22 @@ def main():
     return save_path
 
 
+@contextmanager
+def autocast(enabled):
+    """Run the forward pass under torch.cuda.amp.autocast if enabled.
+       This does not touch torch.cuda.amp otherwise, which is missing in PyTorch < 1.6.
+
+    Args:
+        enabled (bool): enable native mixed precision
+
+    """
+    if enabled:
+        with torch.cuda.amp.autocast():
+            yield
+    else:
+        yield
+
+
 def evaluate(models, dataset, recog_params, args, epoch, logger):
 
     if args.metric == 'edit_distance':
@@ -528,7 +580,11 @@ def evaluate(models, dataset, recog_params, args, epoch, logger):
 
 
 if __name__ == '__main__':
-    # Setting for profiling
-    pr = cProfile.Profile()
-    save_path = pr.runcall(main)
-    pr.dump_stats(os.path.join(save_path, 'train.profile'))
+    # NOTE: profiling is enabled only when NEURAL_SP_PROFILE is set
+    # because cProfile slows down every Python function call
+    if os.environ.get('NEURAL_SP_PROFILE'):
+        pr = cProfile.Profile()
+        save_path = pr.runcall(main)
+        pr.dump_stats(os.path.join(save_path, 'train.profile'))
+    else:
+        main()
@@ -194,6 +194,8 @@ def main():
     start_time_epoch = time.time()
     start_time_step = time.time()
     pbar_epoch = tqdm(total=len(train_set))
+    # NOTE: the progress bar is updated every print_step to reduce I/O
+    n_tokens_pbar = 0
     accum_n_steps = 0
     n_steps = optimizer.n_steps * args.accum_grad_n_steps
     while True:
@@ -224,7 +226,7 @@ def main():
         del loss
         hidden = model.module.repackage_state(hidden)
 
-        pbar_epoch.update(ys_train.shape[0] * (ys_train.shape[1] - 1))
+        n_tokens_pbar += ys_train.shape[0] * (ys_train.shape[1] - 1)
         reporter.add_tensorboard_scalar('learning_rate', optimizer.lr)
         # NOTE: loss/acc/ppl are already added in the model
         reporter.step()
@@ -232,6 +234,9 @@ def main():
         # NOTE: n_steps is different from the step counter in Noam Optimizer
 
         if n_steps % args.print_step == 0:
+            pbar_epoch.update(n_tokens_pbar)
+            n_tokens_pbar = 0
+
             # Compute loss in the dev set
             ys_dev = dev_set.next(bptt=args.bptt)[0]
             loss, _, observation = model(ys_dev, None, is_eval=True)
@@ -254,6 +259,8 @@ def main():
 
         # Save checkpoint and evaluate model per epoch
         if is_new_epoch:
+            pbar_epoch.update(n_tokens_pbar)
+            n_tokens_pbar = 0
             duration_epoch = time.time() - start_time_epoch
             logger.info('========== EPOCH:%d (%.2f min) ==========' %
                         (optimizer.n_epochs + 1, duration_epoch / 60))
@@ -326,7 +333,11 @@ def main():
 
 
 if __name__ == '__main__':
-    # Setting for profiling
-    pr = cProfile.Profile()
-    save_path = pr.runcall(main)
-    pr.dump_stats(os.path.join(save_path, 'train.profile'))
+    # NOTE: profiling is enabled only when NEURAL_SP_PROFILE is set
+    # because cProfile slows down every Python function call
+    if os.environ.get('NEURAL_SP_PROFILE'):
+        pr = cProfile.Profile()
+        save_path = pr.runcall(main)
+        pr.dump_stats(os.path.join(save_path, 'train.profile'))
+    else:
+        main()
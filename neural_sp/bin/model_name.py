@@ -86,7 +86,7 @@ def set_asr_model_name(args):
     else:
         dir_name += '_lr' + str(args.lr)
     dir_name += '_bs' + str(args.batch_size)
-    if args.train_dtype in ["O0", "O1", "O2", "O3"]:
+    if args.train_dtype in ["float16", "O0", "O1", "O2", "O3"]:
         dir_name += '_' + args.train_dtype
     # if args.shuffle_bucket:
     #     dir_name += '_bucket'
@@ -6,6 +6,7 @@
 
 """Utility functions for training."""
 
+import copy
 import functools
 import logging
 import numpy as np
@@ -61,8 +62,13 @@ def measure_time(func):
     return _measure_time
 
 
+# NOTE: parsed configurations are cached per process
+_config_cache = {}
+
+
 def load_config(config_path):
     """Load a configration yaml file.
+       Parsed configurations are cached in memory while the file is unchanged.
 
     Args:
         config_path (str):
@@ -70,11 +76,20 @@ def load_config(config_path):
         params (dict):
 
     """
-    with open(config_path, "r") as f:
-        conf = yaml.load(f, Loader=yaml.FullLoader)
-
-    params = conf['param']
-    return params
+    stat = os.stat(config_path)
+    key = (os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+    if key not in _config_cache:
+        with open(config_path, "r") as f:
+            try:
+                # NOTE: libyaml is much faster than the pure-Python loader
+                conf = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+            except yaml.constructor.ConstructorError:
+                # python-specific tags
+                f.seek(0)
+                conf = yaml.load(f, Loader=yaml.FullLoader)
+        _config_cache[key] = conf['param']
+    # NOTE: callers may modify the returned dict
+    return copy.deepcopy(_config_cache[key])
 
 
 def save_config(conf, save_path):
@@ -126,7 +141,7 @@ def set_save_path(save_path):
     return save_path_new
 
 
-def load_checkpoint(checkpoint_path, model=None, optimizer=None, amp=None):
+def load_checkpoint(checkpoint_path, model=None, optimizer=None, amp=None, scaler=None):
     """Load checkpoint.
 
     Args:
@@ -134,6 +149,7 @@ def load_checkpoint(checkpoint_path, model=None, optimizer=None, amp=None):
         model (torch.nn.Module):
         optimizer (LRScheduler): optimizer wrapped by LRScheduler class
         amp ():
+        scaler (torch.cuda.amp.GradScaler): gradient scaler for mixed precision training
     Returns:
         topk_list (list): list of (epoch, metric)
 
@@ -171,6 +187,13 @@ def load_checkpoint(checkpoint_path, model=None, optimizer=None, amp=None):
     else:
         logger.warning('amp is not loaded.')
 
+    # Restore the loss scale for native mixed precision training
+    if scaler is not None:
+        if 'scaler_state_dict' in checkpoint.keys():
+            scaler.load_state_dict(checkpoint['scaler_state_dict'])
+        else:
+            logger.warning('GradScaler is not loaded.')
+
     if 'optimizer_state_dict' in checkpoint.keys() and 'topk_list' in checkpoint['optimizer_state_dict'].keys():
         topk_list = checkpoint['optimizer_state_dict']['topk_list']
     else:
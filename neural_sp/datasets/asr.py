@@ -10,11 +10,14 @@
 """
 
 import codecs
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import kaldiio
 import numpy as np
 import os
 import pandas as pd
 import random
+import threading
 
 from neural_sp.datasets.token_converter.character import Char2idx
 from neural_sp.datasets.token_converter.character import Idx2char
@@ -38,6 +41,21 @@ def count_vocab_size(dict_path):
     return vocab_count
 
 
+def load_mat(feat_path):
+    """Load a feature matrix.
+
+    Args:
+        feat_path (str): path to a .npy file or a Kaldi ark file (with an offset)
+    Returns:
+        feat (np.ndarray): `[T, input_dim]`
+
+    """
+    # NOTE: memory-map .npy files so that only the header is read here
+    if feat_path.endswith('.npy'):
+        return np.load(feat_path, mmap_mode='r')
+    return kaldiio.load_mat(feat_path)
+
+
 class Dataset(object):
 
     def __init__(self, tsv_path, dict_path,
@@ -50,7 +68,8 @@ class Dataset(object):
                  wp_model_sub1=False, ctc_sub1=False, subsample_factor_sub1=1,
                  tsv_path_sub2=False, dict_path_sub2=False, unit_sub2=False,
                  wp_model_sub2=False, ctc_sub2=False, subsample_factor_sub2=1,
-                 discourse_aware=False, first_n_utterances=-1):
+                 discourse_aware=False, first_n_utterances=-1, feat_cache_dir=False,
+                 n_workers=1, seed=1):
         """A class for loading dataset.
 
         Args:
@@ -78,6 +97,9 @@ class Dataset(object):
             corpus (str): name of corpus
             discourse_aware (bool):
             first_n_utterances (int): evaluate the first N utterances
+            feat_cache_dir (str): directory to cache input features as .npy files
+            n_workers (int): number of threads to load input features in parallel
+            seed (int): seed for the random generators used to shuffle utterances
 
         """
         super(Dataset, self).__init__()
@@ -86,6 +108,11 @@ class Dataset(object):
         self.iteration = 0
         self.offset = 0
 
+        # NOTE: use random generators independent of the main thread
+        # so that mini-batches are reproducible even when loaded in a background thread
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.RandomState(seed)
+
         self.set = os.path.basename(tsv_path).split('.')[0]
         self.is_test = is_test
         self.unit = unit
@@ -101,6 +128,9 @@ class Dataset(object):
         self.dynamic_batching = dynamic_batching
         self.corpus = corpus
         self.discourse_aware = discourse_aware
+        self.feat_cache_dir = feat_cache_dir
+        # NOTE: reading features is I/O-bound, so threads can load them concurrently
+        self.executor = ThreadPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
         if discourse_aware:
             assert not is_test
 
@@ -163,7 +193,7 @@ class Dataset(object):
                 setattr(self, 'df_sub' + str(i), df_sub)
             else:
                 setattr(self, 'df_sub' + str(i), None)
-        self.input_dim = kaldiio.load_mat(df['feat_path'][0]).shape[-1]
+        self.input_dim = load_mat(df['feat_path'][0]).shape[-1]
 
         # Remove inappropriate utterances
         if is_test or discourse_aware:
@@ -245,13 +275,14 @@ class Dataset(object):
             #     df['onset'] = df['utt_id'].apply(lambda x: int(x.split('_')[-1].split('-')[0]))
             #     df = df.sort_values(by=['session', 'onset'], ascending=True)
 
-        elif not is_test:
+        else:
+            # NOTE: utterances are not sorted in the evaluation stage by default (sort_by='utt_id')
             if sort_by == 'input':
                 df = df.sort_values(by=['xlen'], ascending=short2long)
             elif sort_by == 'output':
                 df = df.sort_values(by=['ylen'], ascending=short2long)
             elif sort_by == 'shuffle':
-                df = df.reindex(np.random.permutation(self.df.index))
+                df = df.reindex(self.np_rng.permutation(df.index))
 
         # Re-indexing
         if discourse_aware:
@@ -267,6 +298,8 @@ class Dataset(object):
                     setattr(self, 'df_sub' + str(i),
                             getattr(self, 'df_sub' + str(i)).reindex(df.index).reset_index())
 
+        self._cache_columns()
+
         if discourse_aware:
             self.df_indices_buckets = self.discourse_bucketing(batch_size)
         elif shuffle_bucket:
@@ -327,7 +360,7 @@ class Dataset(object):
             # shuffle the whole data
             if self.epoch + 1 == self.sort_stop_epoch:
                 self.sort_by = 'shuffle'
-                self.df = self.df.reindex(np.random.permutation(self.df.index))
+                self.df = self.df.reindex(self.np_rng.permutation(self.df.index))
                 for i in range(1, 3):
                     if getattr(self, 'df_sub' + str(i)) is not None:
                         setattr(self, 'df_sub' + str(i),
@@ -335,6 +368,7 @@ class Dataset(object):
 
                 # Re-indexing
                 self.df = self.df.reset_index()
+                self._cache_columns()
 
             self.reset()
             self.epoch += 1
@@ -364,7 +398,7 @@ class Dataset(object):
             is_new_epoch = (len(self.df_indices_buckets) == 0)
 
             # Shuffle uttrances in mini-batch
-            df_indices_mb = random.sample(df_indices_mb, len(df_indices_mb))
+            df_indices_mb = self.rng.sample(df_indices_mb, len(df_indices_mb))
         else:
             if len(self.df_indices) > batch_size:
                 # Change batch size dynamically
@@ -389,13 +423,82 @@ class Dataset(object):
                 df_indices_mb = df_indices_mb[:batch_size]
 
             # Shuffle uttrances in mini-batch
-            df_indices_mb = random.sample(df_indices_mb, len(df_indices_mb))
+            df_indices_mb = self.rng.sample(df_indices_mb, len(df_indices_mb))
 
             for i in df_indices_mb:
                 self.df_indices.remove(i)
 
         return df_indices_mb, is_new_epoch
 
+    def _cache_columns(self):
+        """Cache columns read per mini-batch as Python objects keyed by index of self.df.
+
+        This must be called whenever self.df is re-indexed.
+
+        """
+        index = self.df.index.tolist()
+        self._columns = {col: dict(zip(index, self.df[col].tolist()))
+                         for col in ['utt_id', 'speaker', 'session', 'feat_path', 'xlen', 'ylen', 'text']}
+
+        # NOTE: token IDs are parsed per mini-batch in make_mini_batch()
+        self._token_ids = {}
+        if not self.is_test:
+            self._token_ids['ys'] = dict(zip(index, self.df['token_id'].tolist()))
+        for sub in ['sub1', 'sub2']:
+            df_sub = getattr(self, 'df_' + sub)
+            if df_sub is not None:
+                self._token_ids['ys_' + sub] = dict(zip(df_sub.index.tolist(), df_sub['token_id'].tolist()))
+
+    def _parse_token_ids(self, key, i):
+        """Parse token IDs of an utterance into an int32 array.
+
+        Args:
+            key (str): ys/ys_sub1/ys_sub2
+            i (int): index of the utterance in self.df
+        Returns:
+            y (np.ndarray): `[L]`
+
+        """
+        return np.array(str(self._token_ids[key][i]).split(), dtype=np.int32)
+
+    def load_feat(self, i):
+        """Load input features of an utterance.
+           If feat_cache_dir is given, features are saved as a .npy file at the first access
+           and memory-mapped afterwards, which is shared among processes via the page cache.
+           The cache file name contains a hash of the source path (with the offset in the ark file)
+           and its modification time, and the number of frames is checked against the tsv.
+           Features given as .npy files in the tsv are memory-mapped as well.
+
+        Args:
+            i (int): index of the utterance in self.df
+        Returns:
+            feat (np.ndarray): `[T, input_dim]`
+
+        """
+        feat_path = self._columns['feat_path'][i]
+        if not self.feat_cache_dir or feat_path.endswith('.npy'):
+            return load_mat(feat_path)
+
+        # NOTE: experiments sharing feat_cache_dir must not read features of each other
+        ark_path = feat_path.rsplit(':', 1)[0]
+        mtime = os.stat(ark_path).st_mtime_ns if os.path.isfile(ark_path) else 0
+        key = hashlib.md5(('%s %d' % (feat_path, mtime)).encode('utf-8')).hexdigest()
+        cache_path = os.path.join(self.feat_cache_dir, self.set,
+                                  '%s.%s.npy' % (self._columns['utt_id'][i], key))
+        if os.path.isfile(cache_path):
+            feat = np.load(cache_path, mmap_mode='r')
+            if len(feat) == self._columns['xlen'][i]:
+                return feat
+
+        feat = load_mat(feat_path)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # NOTE: write to a temporary file first not to expose partially written files
+        tmp_path = cache_path + '.%d.%d.tmp' % (os.getpid(), threading.get_ident())
+        with open(tmp_path, 'wb') as f:
+            np.save(f, feat)
+        os.replace(tmp_path, cache_path)
+        return feat
+
     def make_mini_batch(self, df_indices_mb):
         """Create mini-batch per step.
 
@@ -404,8 +507,11 @@ class Dataset(object):
         Returns:
             mini_batch_dict (dict):
                 xs (list): input data of size `[T, input_dim]`
+                xs_pad (np.ndarray): padded input data of size `[B, T, input_dim]`
                 xlens (list): lengths of xs
+                max_xlen (int): maximum length of xs
                 ys (list): reference labels in the main task of size `[L]`
+                max_ylen (int): maximum length of ys
                 ys_sub1 (list): reference labels in the 1st auxiliary task of size `[L_sub1]`
                 ys_sub2 (list): reference labels in the 2nd auxiliary task of size `[L_sub2]`
                 utt_ids (list): name of each utterance
@@ -413,38 +519,59 @@ class Dataset(object):
                 sessions (list): name of each session
 
         """
+        # Sort by input lengths in the descending order so that encoders do not have to sort them
+        # NOTE: keep the order when states are carried over between utterances
+        if not self.discourse_aware and self.sort_by != 'utt_id':
+            xlens_mb = np.fromiter((self._columns['xlen'][i] for i in df_indices_mb), dtype=np.int64)
+            df_indices_mb = [df_indices_mb[j] for j in np.argsort(-xlens_mb, kind='stable')]
+
         # inputs
-        xs = [kaldiio.load_mat(self.df['feat_path'][i]) for i in df_indices_mb]
+        if self.executor is not None:
+            xs = list(self.executor.map(self.load_feat, df_indices_mb))
+        else:
+            xs = [self.load_feat(i) for i in df_indices_mb]
+        # NOTE: pad input features once here, and keep each utterance as a view of them
+        xs_pad = np.zeros((len(xs), max(len(x) for x in xs), self.input_dim), dtype=np.float32)
+        for b, x in enumerate(xs):
+            xs_pad[b, :len(x)] = x
+        xs = [xs_pad[b, :len(x)] for b, x in enumerate(xs)]
 
         # outputs
+        # NOTE: parse token IDs into int32 arrays here (in the prefetching thread) rather than in decoders
         if self.is_test:
-            ys = [self.token2idx[0](self.df['text'][i]) for i in df_indices_mb]
+            ys = [self.token2idx[0](self._columns['text'][i]) for i in df_indices_mb]
         else:
-            ys = [list(map(int, str(self.df['token_id'][i]).split())) for i in df_indices_mb]
+            ys = [self._parse_token_ids('ys', i) for i in df_indices_mb]
 
         ys_sub1 = []
         if self.df_sub1 is not None:
-            ys_sub1 = [list(map(int, str(self.df_sub1['token_id'][i]).split())) for i in df_indices_mb]
+            ys_sub1 = [self._parse_token_ids('ys_sub1', i) for i in df_indices_mb]
         elif self.vocab_sub1 > 0 and not self.is_test:
-            ys_sub1 = [self.token2idx[1](self.df['text'][i]) for i in df_indices_mb]
+            ys_sub1 = [self.token2idx[1](self._columns['text'][i]) for i in df_indices_mb]
 
         ys_sub2 = []
         if self.df_sub2 is not None:
-            ys_sub2 = [list(map(int, str(self.df_sub2['token_id'][i]).split())) for i in df_indices_mb]
+            ys_sub2 = [self._parse_token_ids('ys_sub2', i) for i in df_indices_mb]
         elif self.vocab_sub2 > 0 and not self.is_test:
-            ys_sub2 = [self.token2idx[2](self.df['text'][i]) for i in df_indices_mb]
+            ys_sub2 = [self.token2idx[2](self._columns['text'][i]) for i in df_indices_mb]
+
+        xlens = [self._columns['xlen'][i] for i in df_indices_mb]
+        ylens = [self._columns['ylen'][i] for i in df_indices_mb]
 
         mini_batch_dict = {
             'xs': xs,
-            'xlens': [self.df['xlen'][i] for i in df_indices_mb],
+            'xs_pad': xs_pad,
+            'xlens': xlens,
+            'max_xlen': max(xlens),
             'ys': ys,
+            'max_ylen': max(ylens),
             'ys_sub1': ys_sub1,
             'ys_sub2': ys_sub2,
-            'utt_ids': [self.df['utt_id'][i] for i in df_indices_mb],
-            'speakers': [self.df['speaker'][i] for i in df_indices_mb],
-            'sessions': [self.df['session'][i] for i in df_indices_mb],
-            'text': [self.df['text'][i] for i in df_indices_mb],
-            'feat_path': [self.df['feat_path'][i] for i in df_indices_mb],  # for plot
+            'utt_ids': [self._columns['utt_id'][i] for i in df_indices_mb],
+            'speakers': [self._columns['speaker'][i] for i in df_indices_mb],
+            'sessions': [self._columns['session'][i] for i in df_indices_mb],
+            'text': [self._columns['text'][i] for i in df_indices_mb],
+            'feat_path': [self._columns['feat_path'][i] for i in df_indices_mb],  # for plot
         }
         return mini_batch_dict
 
@@ -475,14 +602,14 @@ class Dataset(object):
                 break
 
         # shuffle buckets
-        random.shuffle(df_indices_buckets)
+        self.rng.shuffle(df_indices_buckets)
         return df_indices_buckets
 
     def discourse_bucketing(self, batch_size):
         df_indices_buckets = []  # list of list
         session_groups = [(k, v) for k, v in self.df.groupby('n_utt_in_session').groups.items()]
         if self.shuffle_bucket:
-            random.shuffle(session_groups)
+            self.rng.shuffle(session_groups)
         for n_utt, ids in session_groups:
             first_utt_ids = [i for i in ids if self.df['n_prev_utt'][i] == 0]
             for i in range(0, len(first_utt_ids), batch_size):
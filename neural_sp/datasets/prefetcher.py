@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Kyoto University (Hirofumi Inaguma)
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+"""Prefetch mini-batches in a background thread."""
+
+import copy
+import queue
+import threading
+import torch
+
+
+class Prefetcher(object):
+
+    def __init__(self, dataset, max_size=1, pin_memory=False, **kwargs):
+        """Load the next mini-batch while the current one is being processed.
+
+        Args:
+            dataset (Dataset): dataset to be wrapped
+            max_size (int): number of mini-batches to be loaded in advance
+            pin_memory (bool): copy padded input features to page-locked memory
+                so that they can be transferred to the GPU asynchronously.
+                The page-locked tensor is only read by the model, which copies it
+                before data augmentation modifies the inputs in-place.
+            kwargs: keyword arguments passed to `dataset.next()`
+
+        """
+        super(Prefetcher, self).__init__()
+
+        self.dataset = dataset
+        self.pin_memory = pin_memory
+        self.kwargs = kwargs
+        self.queue = queue.Queue(maxsize=max_size)
+        # NOTE: hold this lock while accessing `dataset` from the main thread,
+        # or iterate a copy taken by `snapshot()`
+        self.lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        while True:
+            try:
+                with self.lock:
+                    mini_batch, is_new_epoch = self.dataset.next(**self.kwargs)
+                    # NOTE: snapshot the progress here since the dataset runs ahead of the main thread
+                    epoch_detail = self.dataset.epoch_detail
+                if self.pin_memory and mini_batch.get('xs_pad') is not None:
+                    mini_batch['xs_pad'] = torch.from_numpy(mini_batch['xs_pad']).pin_memory()
+                item = (mini_batch, is_new_epoch, epoch_detail)
+            except Exception as e:
+                # NOTE: StopIteration is also propagated to the main thread
+                self.queue.put(e)
+                break
+            self.queue.put(item)
+
+    def next(self):
+        """Return the mini-batch prepared in the background thread.
+
+        Returns:
+            mini_batch (dict):
+            is_new_epoch (bool): flag for the end of the current epoch
+            epoch_detail (float): progress of the current epoch right after this mini-batch
+                was sampled. Use this instead of `dataset.epoch_detail`, which is ahead.
+
+        """
+        item = self.queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def snapshot(self):
+        """Return a shallow copy of the wrapped dataset for iterating it in the main thread.
+
+        The copy has its own data counter, so that evaluation can reset and iterate it
+        while the background thread keeps prefetching from the original dataset.
+        The copy must be reset before use.
+
+        Returns:
+            dataset (Dataset): copy of the wrapped dataset
+
+        """
+        with self.lock:
+            return copy.copy(self.dataset)
@@ -7,6 +7,7 @@
 """Character-level token <-> index converter."""
 
 import codecs
+import numpy as np
 import os
 
 
@@ -39,6 +40,17 @@ class Char2idx(object):
                 for line in f:
                     self.nlsyms_list.append(line.strip())
 
+        # Lookup table from unicode code points to indices of single characters
+        # NOTE: -1 is used for characters that must be handled in the slow path
+        unk = self.token2idx.get('<unk>', -1)
+        max_code = max([ord(c) for c in self.token2idx.keys() if len(c) == 1] + [ord(' ')])
+        self.char_lut = np.full(max_code + 1, unk, dtype=np.int64)
+        for c, idx in self.token2idx.items():
+            if len(c) == 1:
+                self.char_lut[ord(c)] = idx
+        self.char_lut[ord(' ')] = self.token2idx.get('<space>', -1)
+        self.unk = unk
+
     def __call__(self, text):
         """Convert character sequence into indices.
 
@@ -48,6 +60,16 @@ class Char2idx(object):
             token_ids (list): character indices
 
         """
+        if len(self.nlsyms_list) == 0 and '<space>' not in text:
+            codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+            if self.remove_space:
+                codes = codes[codes != ord(' ')]
+            token_ids = np.full(len(codes), self.unk, dtype=np.int64)
+            is_known = codes < len(self.char_lut)
+            token_ids[is_known] = self.char_lut[codes[is_known]]
+            if (token_ids >= 0).all():
+                return token_ids.tolist()
+
         token_ids = []
         words = text.replace(' ', '<space>').split('<space>')
         for i, w in enumerate(words):
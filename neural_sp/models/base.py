@@ -29,6 +29,28 @@ class ModelBase(nn.Module):
     def torch_version(self):
         return float('.'.join(torch.__version__.split('.')[:2]))
 
+    def inference_mode(self, enable=True):
+        """Return a context manager to disable gradient computation in the inference stage.
+           torch.inference_mode (>= 1.9) additionally skips version counting and view tracking,
+           but tensors created in it cannot be used for back-propagation later.
+
+        Args:
+            enable (bool): use torch.inference_mode if available, otherwise torch.no_grad
+        Returns:
+            context manager
+
+        """
+        if enable and hasattr(torch, 'inference_mode'):
+            return torch.inference_mode()
+        return torch.no_grad()
+
+    def quantize(self):
+        """Quantize weights in linear and LSTM layers to int8 dynamically.
+           This is used for CPU inference after loading parameters."""
+        assert hasattr(torch, 'quantization'), 'PyTorch >= 1.4 is required for dynamic quantization.'
+        torch.quantization.quantize_dynamic(self, {nn.Linear, nn.LSTM}, dtype=torch.qint8, inplace=True)
+        logger.info('Quantize parameters of nn.Linear and nn.LSTM to int8.')
+
     @property
     def num_params_dict(self):
         if not hasattr(self, '_nparams_dict'):
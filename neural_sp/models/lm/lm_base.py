@@ -51,7 +51,7 @@ class LMBase(ModelBase):
         """
         if is_eval:
             self.eval()
-            with torch.no_grad():
+            with self.inference_mode():
                 loss, state, observation = self._forward(ys, state, n_caches, predict_last)
         else:
             self.train()
@@ -180,7 +180,8 @@ class RNNLM(LMBase):
         residual = None
         new_hxs, new_cxs = [], []
         for lth in range(self.n_layers):
-            self.rnn[lth].flatten_parameters()  # for multi-GPUs
+            if ys_emb.is_cuda:
+                self.rnn[lth].flatten_parameters()  # for multi-GPUs
 
             # Path through RNN
             if self.rnn_type == 'lstm':
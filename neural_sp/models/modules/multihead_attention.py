@@ -91,11 +91,12 @@ class MultiheadAttentionMechanism(nn.Module):
         self.mask = None
 
     def forward(self, key, value, query, mask, aw_prev=None,
-                cache=False, mode='', trigger_point=None, eps_wait=-1):
+                cache=False, mode='', trigger_point=None, eps_wait=-1, kv_cache=None):
         """Forward pass.
 
         Args:
             key (FloatTensor): `[B, klen, kdim]`
+                The batch dimension can be 1 to share key among all queries (e.g., hypotheses in beam search).
             value (FloatTensor): `[B, klen, vdim]`
             query (FloatTensor): `[B, qlen, qdim]`
             mask (ByteTensor): `[B, qlen, klen]`
@@ -104,6 +105,9 @@ class MultiheadAttentionMechanism(nn.Module):
             mode: dummy interface for MoChA/MMA
             trigger_point: dummy interface for MoChA/MMA
             eps_wait: dummy interface for MMA
+            kv_cache (tuple): projected key and value of previous frames,
+                each of which is of size `[B, klen_prev, H, d_k]`.
+                Only new frames in key/value are projected and appended to them.
         Returns:
             cv (FloatTensor): `[B, qlen, vdim]`
             aw (FloatTensor): `[B, H, qlen, klen]`
@@ -111,12 +115,17 @@ class MultiheadAttentionMechanism(nn.Module):
             p_choose: dummy interface for MoChA/MMA
 
         """
-        bs, klen = key.size()[: 2]
-        qlen = query.size(1)
+        kbs, klen = key.size()[: 2]
+        bs, qlen = query.size()[: 2]
+        assert kbs in [1, bs]
 
         if self.key is None or not cache:
-            self.key = self.w_key(key).view(bs, -1, self.n_heads, self.d_k)  # `[B, klen, H, d_k]`
-            self.value = self.w_value(value).view(bs, -1, self.n_heads, self.d_k)  # `[B, klen, H, d_k]`
+            self.key = self.w_key(key).view(kbs, -1, self.n_heads, self.d_k)  # `[B, klen, H, d_k]`
+            self.value = self.w_value(value).view(kbs, -1, self.n_heads, self.d_k)  # `[B, klen, H, d_k]`
+            if kv_cache is not None:
+                self.key = torch.cat([kv_cache[0], self.key], dim=1)
+                self.value = torch.cat([kv_cache[1], self.value], dim=1)
+                klen = self.key.size(1)
             self.mask = mask
             if self.mask is not None:
                 self.mask = self.mask.unsqueeze(3).repeat([1, 1, 1, self.n_heads])
@@ -125,8 +134,17 @@ class MultiheadAttentionMechanism(nn.Module):
 
         query = self.w_query(query).view(bs, -1, self.n_heads, self.d_k)  # `[B, qlen, H, d_k]`
 
+        # NOTE: broadcast key/value over queries by folding the batch dimension into
+        # the query length, instead of replicating them for each query
+        broadcast = kbs == 1 and bs > 1
+
         if self.atype == 'scaled_dot':
-            e = torch.einsum("bihd,bjhd->bijh", (query, self.key)) / self.scale  # `[B, qlen, klen, H]`
+            if broadcast:
+                e = torch.einsum("bihd,bjhd->bijh", (query.contiguous().view(1, bs * qlen, self.n_heads, self.d_k),
+                                                     self.key)) / self.scale
+                e = e.reshape(bs, qlen, klen, self.n_heads)
+            else:
+                e = torch.einsum("bihd,bjhd->bijh", (query, self.key)) / self.scale  # `[B, qlen, klen, H]`
         elif self.atype == 'add':
             key = self.key.unsqueeze(1)  # `[B, 1, klen, H, d_k]`
             query = query.unsqueeze(2)  # `[B, qlen, 1, H, d_k]`
@@ -147,7 +165,11 @@ class MultiheadAttentionMechanism(nn.Module):
             aw_masked = headdrop(aw_masked, self.n_heads, self.dropout_head)  # `[B, H, qlen, klen]`
             aw_masked = aw_masked.permute(0, 2, 3, 1)
 
-        cv = torch.einsum("bijh,bjhd->bihd", (aw_masked, self.value))  # `[B, qlen, H, d_k]`
+        if broadcast:
+            cv = torch.einsum("bijh,bjhd->bihd", (aw_masked.reshape(1, bs * qlen, klen, self.n_heads),
+                                                  self.value))
+        else:
+            cv = torch.einsum("bijh,bjhd->bihd", (aw_masked, self.value))  # `[B, qlen, H, d_k]`
         cv = cv.contiguous().view(bs, -1, self.n_heads * self.d_k)  # `[B, qlen, H * d_k]`
         cv = self.w_out(cv)
         aw = aw.permute(0, 3, 1, 2)  # `[B, H, qlen, klen]`
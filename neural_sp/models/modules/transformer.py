@@ -170,7 +170,7 @@ class TransformerDecoderBlock(nn.Module):
     def forward(self, ys, yy_mask, xs=None, xy_mask=None, cache=None,
                 xy_aws_prev=None,
                 mode='hard', eps_wait=-1, lmout=None,
-                pos_embs=None, memory=None, u_bias=None, v_bias=None):
+                pos_embs=None, memory=None, u_bias=None, v_bias=None, kv_cache=None):
         """Transformer decoder forward pass.
 
         Args:
@@ -187,6 +187,9 @@ class TransformerDecoderBlock(nn.Module):
             memory (FloatTensor): `[B, L_prev, d_model]`
             u_bias (FloatTensor): global parameter for TransformerXL
             v_bias (FloatTensor): global parameter for TransformerXL
+            kv_cache (tuple): key and value in the self-attention of previous tokens,
+                each of which is of size `[B, L-1, H, d_k]`. This is used with `cache`.
+                The updated ones are accessible via `self.self_attn.key/value`.
         Returns:
             out (FloatTensor): `[B, L, d_model]`
 
@@ -207,6 +210,10 @@ class TransformerDecoderBlock(nn.Module):
             else:
                 ys = self.norm1(ys)
                 cat = ys
+        elif kv_cache is not None:
+            # NOTE: keys and values of previous tokens are not recomputed
+            assert cache is not None
+            ys = self.norm1(ys[:, -1:])
         else:
             ys = self.norm1(ys)
 
@@ -221,7 +228,8 @@ class TransformerDecoderBlock(nn.Module):
         if self.memory_transformer:
             out, self._yy_aws = self.self_attn(cat, ys_q, pos_embs, yy_mask, u_bias, v_bias)
         else:
-            out, self._yy_aws = self.self_attn(ys, ys, ys_q, mask=yy_mask)[:2]  # k/v/q
+            out, self._yy_aws = self.self_attn(ys, ys, ys_q, mask=yy_mask,
+                                               kv_cache=kv_cache)[:2]  # k/v/q
         out = self.dropout(out) + residual
 
         # attention over encoder stacks
@@ -45,8 +45,47 @@ class BeamSearch(object):
             if prune:
                 end_hyps = end_hyps[:self.beam_width + self.beam_width_bwd]
             is_finish = True
+        # NOTE: the beam can be narrower than beam_width after dynamic pruning
+        if len(new_hyps) == 0:
+            is_finish = True
         return new_hyps, end_hyps, is_finish
 
+    def prune_by_score(self, hyps_sorted, beam_threshold):
+        """Remove hypotheses whose scores are lower than the best one by more than beam_threshold.
+           This narrows the beam dynamically while decoding is confident.
+
+        Args:
+            hyps_sorted (list): hypotheses sorted by score in descending order
+            beam_threshold (float): score margin from the best hypothesis (disabled if <= 0)
+        Returns:
+            hyps_sorted (list): surviving hypotheses
+
+        """
+        if beam_threshold <= 0 or len(hyps_sorted) == 0:
+            return hyps_sorted
+        min_score = hyps_sorted[0]['score'] - beam_threshold
+        return [hyp for hyp in hyps_sorted if hyp['score'] >= min_score]
+
+    def is_finish_early(self, hyps, end_hyps, n_remaining_steps, lp_weight=0., nbest=1):
+        """Check if none of active hypotheses can outperform the ended ones.
+           This assumes that scores of active hypotheses never increase except for the length reward.
+
+        Args:
+            hyps (list): active hypotheses
+            end_hyps (list): ended hypotheses
+            n_remaining_steps (int): number of remaining decoding steps
+            lp_weight (float): length reward added per token
+            nbest (int): number of ended hypotheses to be kept
+        Returns:
+            is_finish (bool):
+
+        """
+        if len(hyps) == 0 or len(end_hyps) < nbest:
+            return False
+        max_score_active = max([hyp['score'] for hyp in hyps]) + max(lp_weight, 0) * n_remaining_steps
+        nth_score_end = sorted([hyp['score'] for hyp in end_hyps], reverse=True)[nbest - 1]
+        return nth_score_end > max_score_active
+
     def add_ctc_score(self, hyp, topk_ids, ctc_state, total_scores_topk,
                       ctc_prefix_scorer, new_chunk=False, backward=False):
         beam_width = self.beam_width_bwd if backward else self.beam_width
@@ -84,8 +84,11 @@ class CTC(DecoderBase):
         else:
             self.output = nn.Linear(enc_n_units, vocab)
 
-        import warpctc_pytorch
-        self.warpctc_loss = warpctc_pytorch.CTCLoss(size_average=True)
+        try:
+            self.ctc_loss = nn.CTCLoss(blank=blank, reduction='sum', zero_infinity=True)
+        except TypeError:
+            # NOTE: zero_infinity is supported from PyTorch 1.1
+            self.ctc_loss = nn.CTCLoss(blank=blank, reduction='sum')
 
         self.forced_aligner = CTCForcedAligner()
 
@@ -100,14 +103,18 @@ class CTC(DecoderBase):
             loss (FloatTensor): `[1]`
 
         """
-        # Concatenate all elements in ys for warpctc_pytorch
-        ylens = np2tensor(np.fromiter([len(y) for y in ys], dtype=np.int32))
-        ys_ctc = torch.cat([np2tensor(np.fromiter(y[::-1] if self.bwd else y, dtype=np.int32))
-                            for y in ys], dim=0)
+        # Concatenate all elements in ys
+        ylens = torch.tensor([len(y) for y in ys], dtype=torch.int32)
+        # NOTE: flatten labels into a single preallocated int32 buffer on CPU
+        ys_ctc = np.empty(sum(len(y) for y in ys), dtype=np.int32)
+        np.concatenate([y[::-1] if self.bwd else y for y in ys], out=ys_ctc)
+        ys_ctc = torch.from_numpy(ys_ctc)
         # NOTE: do not copy to GPUs here
 
         # Compute CTC loss
-        logits = self.output(eouts)
+        # NOTE: compute logits in the time-major layout so that the CTC loss does not
+        # have to make a transposed copy of them, and keep a `[B, T, vocab]` view for the rest
+        logits = self.output(eouts.transpose(1, 0)).transpose(1, 0)
         loss = self.loss_fn(logits, ys_ctc, elens, ylens)
 
         # Label smoothing for CTC
@@ -127,10 +134,10 @@ class CTC(DecoderBase):
         return loss, trigger_points
 
     def loss_fn(self, logits, ys_ctc, elens, ylens):
-        loss = self.warpctc_loss(logits.transpose(1, 0),  # time-major
-                                 ys_ctc, elens.cpu(), ylens).to(self.device)
-        # NOTE: ctc loss has already been normalized by bs
-        # NOTE: index 0 is reserved for blank in warpctc_pytorch
+        # NOTE: compute in float32 (e.g., under autocast)
+        log_probs = torch.log_softmax(logits.transpose(1, 0).float(), dim=-1)  # `[T, B, vocab]`
+        loss = self.ctc_loss(log_probs, ys_ctc.to(self.device), elens, ylens) / logits.size(0)
+        # NOTE: normalized by bs
         return loss
 
     def trigger_points(self, eouts, elens):
@@ -188,12 +195,12 @@ class CTC(DecoderBase):
             hyps (np.ndarray): Best path hypothesis. `[B, L]`
 
         """
-        log_probs = torch.log_softmax(self.output(eouts), dim=-1)
-        best_paths = log_probs.argmax(-1)  # `[B, L]`
+        # NOTE: softmax is monotonic, so take argmax over logits directly
+        best_paths = tensor2np(self.output(eouts).argmax(-1))  # `[B, T]`
 
         hyps = []
         for b in range(eouts.size(0)):
-            indices = [best_paths[b, t].item() for t in range(elens[b])]
+            indices = best_paths[b, :elens[b]].tolist()
 
             # Step 1. Collapse repeated labels
             collapsed_indices = [x[0] for x in groupby(indices)]
@@ -246,6 +253,11 @@ class CTC(DecoderBase):
 
         best_hyps = []
         log_probs = torch.log_softmax(self.output(eouts), dim=-1)
+        # NOTE: pick up the top-k scores at all time steps at once, and copy them to CPU in a single
+        # transfer instead of synchronizing with the device for every score in the loop below
+        _, topk_ids = torch.topk(log_probs, k=min(beam_width, self.vocab), dim=-1, largest=True, sorted=True)
+        log_probs = tensor2np(log_probs)
+        topk_ids = tensor2np(topk_ids)
         for b in range(bs):
             # Elements in the beam are (prefix, (p_b, p_no_blank))
             # Initialize the beam with the empty sequence, a probability of
@@ -258,10 +270,7 @@ class CTC(DecoderBase):
 
             for t in range(elens[b]):
                 new_beam = []
-
-                # Pick up the top-k scores
-                log_probs_topk, topk_ids = torch.topk(
-                    log_probs[b:b + 1, t], k=min(beam_width, self.vocab), dim=-1, largest=True, sorted=True)
+                log_probs_t = log_probs[b, t]
 
                 for i_beam in range(len(beam)):
                     hyp = beam[i_beam]['hyp'][:]
@@ -270,10 +279,10 @@ class CTC(DecoderBase):
                     score_lm = beam[i_beam]['score_lm']
 
                     # case 1. hyp is not extended
-                    new_p_b = np.logaddexp(p_b + log_probs[b, t, self.blank].item(),
-                                           p_nb + log_probs[b, t, self.blank].item())
+                    new_p_b = np.logaddexp(p_b + float(log_probs_t[self.blank]),
+                                           p_nb + float(log_probs_t[self.blank]))
                     if len(hyp) > 1:
-                        new_p_nb = p_nb + log_probs[b, t, hyp[-1]].item()
+                        new_p_nb = p_nb + float(log_probs_t[hyp[-1]])
                     else:
                         new_p_nb = LOG_0
                     score_ctc = np.logaddexp(new_p_b, new_p_nb)
@@ -296,8 +305,8 @@ class CTC(DecoderBase):
 
                     # case 2. hyp is extended
                     new_p_b = LOG_0
-                    for c in tensor2np(topk_ids)[0]:
-                        p_t = log_probs[b, t, c].item()
+                    for c in topk_ids[b, t]:
+                        p_t = float(log_probs_t[c])
 
                         if c == self.blank:
                             continue
@@ -154,6 +154,23 @@ class DecoderBase(ModelBase):
                                              nbest, refs_id, utt_ids, speakers)
         return best_hyps
 
+    def ctc_logits(self, eouts, temperature=1.):
+        """Return CTC logits scaled by the softmax temperature.
+
+        Args:
+            eouts (FloatTensor): `[B, T, enc_units]`
+            temperature (float): softmax temperature
+        Returns:
+            logits (FloatTensor): `[B, T, vocab]`
+
+        """
+        logits = self.ctc.output(eouts)
+        # NOTE: skip an extra pass over `[B, T, vocab]` in the default setting,
+        # and otherwise scale the fresh output in-place
+        if temperature != 1:
+            logits.mul_(1 / temperature)
+        return logits
+
     def ctc_probs(self, eouts, temperature=1.):
         """Return CTC probabilities.
 
@@ -163,7 +180,7 @@ class DecoderBase(ModelBase):
             probs (FloatTensor): `[B, T, vocab]`
 
         """
-        return torch.softmax(self.ctc.output(eouts) / temperature, dim=-1)
+        return torch.softmax(self.ctc_logits(eouts, temperature), dim=-1)
 
     def ctc_log_probs(self, eouts, temperature=1.):
         """Return log-scale CTC probabilities.
@@ -174,7 +191,7 @@ class DecoderBase(ModelBase):
             log_probs (FloatTensor): `[B, T, vocab]`
 
         """
-        return torch.log_softmax(self.ctc.output(eouts) / temperature, dim=-1)
+        return torch.log_softmax(self.ctc_logits(eouts, temperature), dim=-1)
 
     def ctc_probs_topk(self, eouts, temperature=1., topk=None):
         """Get CTC top-K probabilities.
@@ -188,7 +205,7 @@ class DecoderBase(ModelBase):
             topk_ids (LongTensor): `[B, T, topk]`
 
         """
-        probs = torch.softmax(self.ctc.output(eouts) / temperature, dim=-1)
+        probs = torch.softmax(self.ctc_logits(eouts, temperature), dim=-1)
         if topk is None:
             topk = probs.size(-1)
         _, topk_ids = torch.topk(probs, k=topk, dim=-1, largest=True, sorted=True)
@@ -1037,6 +1037,7 @@ class RNNDecoder(DecoderBase):
         lm_weight_second_bwd = params['recog_lm_bwd_weight']
         gnmt_decoding = params['recog_gnmt_decoding']
         eos_threshold = params['recog_eos_threshold']
+        beam_threshold = params['recog_beam_threshold']
         asr_state_CO = params['recog_asr_state_carry_over']
         lm_state_CO = params['recog_lm_state_carry_over']
         softmax_smoothing = params['recog_softmax_smoothing']
@@ -1056,6 +1057,9 @@ class RNNDecoder(DecoderBase):
             assert ctc_weight > 0
             ctc_log_probs = tensor2np(ctc_log_probs)
 
+        # NOTE: scores are monotonically non-increasing except for the length reward
+        early_stop = not length_norm and not gnmt_decoding and cp_weight == 0 and lm_second is None and lm_second_bwd is None
+
         nbest_hyps_idx, aws, scores = [], [], []
         eos_flags = []
         for b in range(bs):
@@ -1069,9 +1073,9 @@ class RNNDecoder(DecoderBase):
             ctc_prefix_scorer = None
             if ctc_log_probs is not None:
                 if self.bwd:
-                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b][::-1], self.blank, self.eos)
+                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b, :elens[b]][::-1], self.blank, self.eos)
                 else:
-                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b], self.blank, self.eos)
+                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b, :elens[b]], self.blank, self.eos)
 
             # Ensemble initialization
             ensmbl_dstate, ensmbl_cv = [], []
@@ -1127,7 +1131,7 @@ class RNNDecoder(DecoderBase):
                 y = eouts.new_zeros((len(hyps), 1), dtype=torch.int64)
                 for j, beam in enumerate(hyps):
                     if self.replace_sos and i == 0:
-                        prev_idx = refs_id[0][0]
+                        prev_idx = refs_id[b][0]
                     else:
                         prev_idx = beam['hyp'][-1]
                     y[j, 0] = prev_idx
@@ -1168,8 +1172,9 @@ class RNNDecoder(DecoderBase):
                                                                cache=lmstate if cache_states else None)
 
                 # for the main model
+                # NOTE: expand encoder outputs over hypotheses without copying them
                 dstates, cv, aw, attn_v, _, _ = self.decode_step(
-                    eouts[b:b + 1, :elens[b]].repeat([cv.size(0), 1, 1]),
+                    eouts[b:b + 1, :elens[b]].expand(cv.size(0), -1, -1),
                     dstates, cv, self.dropout_emb(self.embed(y)), None, aw, lmout)
                 probs = torch.softmax(self.output(attn_v).squeeze(1) * softmax_smoothing, dim=1)
 
@@ -1184,7 +1189,7 @@ class RNNDecoder(DecoderBase):
                     dstates_e = {'dstate': (hxs_e, cxs_e)}
 
                     dstates_e, cv_e, aw_e, attn_v_e, _, _ = dec.decode_step(
-                        ensmbl_eouts[i_e][b:b + 1, :ensmbl_elens[i_e][b]].repeat([cv_e.size(0), 1, 1]),
+                        ensmbl_eouts[i_e][b:b + 1, :ensmbl_elens[i_e][b]].expand(cv_e.size(0), -1, -1),
                         dstates_e, cv_e, dec.dropout_emb(dec.embed(y)), None, aw_e, lmout)
 
                     ensmbl_dstate += [{'dstate': (dstates_e['dstate'][0][:, j:j + 1],
@@ -1195,7 +1200,8 @@ class RNNDecoder(DecoderBase):
                     # NOTE: sum in the probability scale (not log-scale)
 
                 # Ensemble
-                scores_att = torch.log(probs / n_models)
+                # NOTE: `probs` is not used afterwards, so normalize and take log in-place
+                scores_att = probs.div_(n_models).log_()
 
                 new_hyps = []
                 for j, beam in enumerate(hyps):
@@ -1292,6 +1298,7 @@ class RNNDecoder(DecoderBase):
 
                 # Local pruning
                 new_hyps_sorted = sorted(new_hyps, key=lambda x: x['score'], reverse=True)[:beam_width]
+                new_hyps_sorted = helper.prune_by_score(new_hyps_sorted, beam_threshold)
 
                 # Remove complete hypotheses
                 new_hyps, end_hyps, is_finish = helper.remove_complete_hyp(
@@ -1300,6 +1307,10 @@ class RNNDecoder(DecoderBase):
                 if is_finish:
                     break
 
+                # Stop when active hypotheses cannot outperform the ended ones
+                if early_stop and helper.is_finish_early(hyps, end_hyps, ymax - i - 1, lp_weight, nbest):
+                    break
+
             # Global pruning
             if len(end_hyps) == 0:
                 end_hyps = hyps[:]
@@ -1346,10 +1357,13 @@ class RNNDecoder(DecoderBase):
             if self.bwd:
                 # Reverse the order
                 nbest_hyps_idx += [[np.array(end_hyps[n]['hyp'][1:][::-1]) for n in range(nbest)]]
-                aws += [[tensor2np(torch.cat(end_hyps[n]['aws'][1:][::-1], dim=2).squeeze(0)) for n in range(nbest)]]
+                aws_nbest = [torch.cat(end_hyps[n]['aws'][1:][::-1], dim=2) for n in range(nbest)]
             else:
                 nbest_hyps_idx += [[np.array(end_hyps[n]['hyp'][1:]) for n in range(nbest)]]
-                aws += [[tensor2np(torch.cat(end_hyps[n]['aws'][1:], dim=2).squeeze(0)) for n in range(nbest)]]
+                aws_nbest = [torch.cat(end_hyps[n]['aws'][1:], dim=2) for n in range(nbest)]
+            # NOTE: copy attention weights of all n-best hypotheses to CPU at once
+            aws += [np.split(tensor2np(torch.cat(aws_nbest, dim=2).squeeze(0)),
+                             np.cumsum([aw.size(2) for aw in aws_nbest])[:-1], axis=1)]
             if length_norm:
                 scores += [[end_hyps[n]['score_att'] / len(end_hyps[n]['hyp'][1:]) for n in range(nbest)]]
             else:
@@ -1489,7 +1503,7 @@ class RNNDecoder(DecoderBase):
                 self.lm if self.lm is not None else lm, hyps, y)
 
             dstates, cv, aw, attn_v, _, _ = self.decode_step(
-                eouts_c[0:1].repeat([cv.size(0), 1, 1]),
+                eouts_c[0:1].expand(cv.size(0), -1, -1),
                 dstates, cv, self.dropout_emb(self.embed(y)), None, aw, lmout, cache=False)
             scores_att = torch.log_softmax(self.output(attn_v).squeeze(1), dim=1)
 
@@ -238,7 +238,7 @@ class RNNTransducer(DecoderBase):
         # Append <sos> and <eos>
         eos = eouts.new_zeros(1).fill_(self.eos).long()
         _ys = [np2tensor(np.fromiter(y, dtype=np.int64), self.device) for y in ys]
-        ylens = np2tensor(np.fromiter([y.size(0) for y in _ys], dtype=np.int32))
+        ylens = torch.tensor([y.size(0) for y in _ys], dtype=torch.int32)
         ys_in = pad_list([torch.cat([eos, y], dim=0) for y in _ys], self.pad)
         ys_out = pad_list(_ys, self.blank)
 
@@ -462,7 +462,7 @@ class RNNTransducer(DecoderBase):
             # For joint CTC-Attention decoding
             ctc_prefix_scorer = None
             if ctc_log_probs is not None:
-                ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b], self.blank, self.eos)
+                ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b, :elens[b]], self.blank, self.eos)
 
             if speakers is not None:
                 if speakers[b] == self.prev_spk:
@@ -486,7 +486,7 @@ class RNNTransducer(DecoderBase):
             for t in range(elens[b]):
                 # preprocess for batch decoding
                 douts = torch.cat([beam['dout'] for beam in hyps], dim=0)
-                outs = self.joint(eouts[b:b + 1, t:t + 1].repeat([douts.size(0), 1, 1]), douts)
+                outs = self.joint(eouts[b:b + 1, t:t + 1].expand(douts.size(0), -1, -1), douts)
                 scores_rnnt = torch.log_softmax(outs.squeeze(2).squeeze(1), dim=-1)
 
                 # Update LM states for shallow fusion
@@ -552,6 +552,7 @@ class TransformerDecoder(DecoderBase):
         ys = eouts.new_zeros((bs, 1), dtype=torch.int64).fill_(self.eos)
 
         cache = [None] * self.n_layers
+        kv_cache = [None] * self.n_layers
 
         hyps_batch = []
         ylens = torch.zeros(bs).int()
@@ -563,16 +564,21 @@ class TransformerDecoder(DecoderBase):
             causal_mask = torch.tril(causal_mask, out=causal_mask).unsqueeze(0).repeat([bs, 1, 1])
 
             new_cache = [None] * self.n_layers
+            new_kv_cache = [None] * self.n_layers
             xy_aws_layers = []
             out = self.pos_enc(self.embed(ys))  # scaled + dropout
             for lth, layer in enumerate(self.layers):
-                out = layer(out, causal_mask, eouts, None, cache=cache[lth])
+                out = layer(out, causal_mask, eouts, None, cache=cache[lth],
+                            kv_cache=kv_cache[lth])
                 new_cache[lth] = out
+                if not self.memory_transformer:
+                    new_kv_cache[lth] = (layer.self_attn.key, layer.self_attn.value)
                 if layer.xy_aws is not None:
                     xy_aws_layers.append(layer.xy_aws[:, :, -1:])
 
             if cache_states:
                 cache = new_cache[:]
+                kv_cache = new_kv_cache[:]
 
             # Pick up 1-best
             y = self.output(self.norm_out(out))[:, -1:].argmax(-1)
@@ -679,6 +685,7 @@ class TransformerDecoder(DecoderBase):
         lm_weight_second = params['recog_lm_second_weight']
         lm_weight_second_bwd = params['recog_lm_bwd_weight']
         eos_threshold = params['recog_eos_threshold']
+        beam_threshold = params['recog_beam_threshold']
         lm_state_carry_over = params['recog_lm_state_carry_over']
         softmax_smoothing = params['recog_softmax_smoothing']
         eps_wait = params['recog_mma_delay_threshold']
@@ -697,6 +704,9 @@ class TransformerDecoder(DecoderBase):
             assert ctc_weight > 0
             ctc_log_probs = tensor2np(ctc_log_probs)
 
+        # NOTE: scores are monotonically non-increasing except for the length reward
+        early_stop = not length_norm and lm_second is None and lm_second_bwd is None
+
         nbest_hyps_idx, aws, scores = [], [], []
         eos_flags = []
         for b in range(bs):
@@ -708,9 +718,9 @@ class TransformerDecoder(DecoderBase):
             ctc_prefix_scorer = None
             if ctc_log_probs is not None:
                 if self.bwd:
-                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b][::-1], self.blank, self.eos)
+                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b, :elens[b]][::-1], self.blank, self.eos)
                 else:
-                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b], self.blank, self.eos)
+                    ctc_prefix_scorer = CTCPrefixScore(ctc_log_probs[b, :elens[b]], self.blank, self.eos)
 
             if speakers is not None:
                 if speakers[b] == self.prev_spk:
@@ -724,6 +734,7 @@ class TransformerDecoder(DecoderBase):
             hyps = [{'hyp': [self.eos],
                      'ys': ys,
                      'cache': None,
+                     'kv_cache': None,
                      'score': 0.,
                      'score_att': 0.,
                      'score_ctc': 0.,
@@ -739,9 +750,13 @@ class TransformerDecoder(DecoderBase):
             for i in range(ymax):
                 # batchfy all hypotheses for batch decoding
                 cache = [None] * self.n_layers
+                kv_cache = [None] * self.n_layers
                 if cache_states and i > 0:
                     for lth in range(self.n_layers):
                         cache[lth] = torch.cat([beam['cache'][lth] for beam in hyps], dim=0)
+                        if not self.memory_transformer:
+                            kv_cache[lth] = (torch.cat([beam['kv_cache'][lth][0] for beam in hyps], dim=0),
+                                             torch.cat([beam['kv_cache'][lth][1] for beam in hyps], dim=0))
                 ys = eouts.new_zeros((len(hyps), i + 1), dtype=torch.int64)
                 for j, beam in enumerate(hyps):
                     ys[j, :] = beam['ys']
@@ -767,8 +782,12 @@ class TransformerDecoder(DecoderBase):
                     hidden_states = [out]
 
                 n_heads_total = 0
-                eouts_b = eouts[b:b + 1, :elens[b]].repeat([ys.size(0), 1, 1])
+                eouts_b = eouts[b:b + 1, :elens[b]]
+                if 'mocha' in self.attn_type:
+                    eouts_b = eouts_b.expand(ys.size(0), -1, -1)
+                # NOTE: otherwise, encoder outputs are broadcast over hypotheses in MHA
                 new_cache = [None] * self.n_layers
+                new_kv_cache = [None] * self.n_layers
                 xy_aws_layers = []
                 lth_s = self.mocha_first_layer - 1
                 for lth, layer in enumerate(self.layers):
@@ -783,7 +802,9 @@ class TransformerDecoder(DecoderBase):
                             out, causal_mask, eouts_b, None,
                             cache=cache[lth],
                             xy_aws_prev=xy_aws_prev[:, lth - lth_s] if lth >= lth_s and i > 0 else None,
-                            eps_wait=eps_wait)
+                            eps_wait=eps_wait,
+                            kv_cache=kv_cache[lth])
+                        new_kv_cache[lth] = (layer.self_attn.key, layer.self_attn.value)
 
                     new_cache[lth] = out
                     if layer.xy_aws is not None:
@@ -803,7 +824,9 @@ class TransformerDecoder(DecoderBase):
                 ensmbl_new_cache = [[None] * dec.n_layers for dec in ensmbl_decs]
                 for i_e, dec in enumerate(ensmbl_decs):
                     out_e = dec.pos_enc(dec.embed(ys))  # scaled + dropout
-                    eouts_e = ensmbl_eouts[i_e][b:b + 1, :elens[b]].repeat([ys.size(0), 1, 1])
+                    eouts_e = ensmbl_eouts[i_e][b:b + 1, :elens[b]]
+                    if 'mocha' in dec.attn_type:
+                        eouts_e = eouts_e.expand(ys.size(0), -1, -1)
                     for lth in range(dec.n_layers):
                         out_e = dec.layers[lth](out_e, causal_mask, eouts_e, None,
                                                 cache=ensmbl_cache[i_e][lth])
@@ -813,7 +836,8 @@ class TransformerDecoder(DecoderBase):
                     # NOTE: sum in the probability scale (not log-scale)
 
                 # Ensemble
-                scores_att = torch.log(probs / n_models)
+                # NOTE: `probs` is not used afterwards, so normalize and take log in-place
+                scores_att = probs.div_(n_models).log_()
 
                 new_hyps = []
                 for j, beam in enumerate(hyps):
@@ -884,6 +908,7 @@ class TransformerDecoder(DecoderBase):
                             {'hyp': beam['hyp'] + [idx],
                              'ys': torch.cat([beam['ys'], eouts.new_zeros((1, 1), dtype=torch.int64).fill_(idx)], dim=-1),
                              'cache': [new_cache_l[j:j + 1] for new_cache_l in new_cache] if cache_states else cache,
+                             'kv_cache': [(k_l[j:j + 1], v_l[j:j + 1]) for k_l, v_l in new_kv_cache] if cache_states and not self.memory_transformer else None,
                              'score': total_score,
                              'score_att': total_scores_att[0, idx].item(),
                              'score_ctc': total_scores_ctc[k].item(),
@@ -899,6 +924,7 @@ class TransformerDecoder(DecoderBase):
 
                 # Local pruning
                 new_hyps_sorted = sorted(new_hyps, key=lambda x: x['score'], reverse=True)[:beam_width]
+                new_hyps_sorted = helper.prune_by_score(new_hyps_sorted, beam_threshold)
 
                 # Remove complete hypotheses
                 new_hyps, end_hyps, is_finish = helper.remove_complete_hyp(
@@ -907,6 +933,10 @@ class TransformerDecoder(DecoderBase):
                 if is_finish:
                     break
 
+                # Stop when active hypotheses cannot outperform the ended ones
+                if early_stop and helper.is_finish_early(hyps, end_hyps, ymax - i - 1, lp_weight, nbest):
+                    break
+
             # Global pruning
             if len(end_hyps) == 0:
                 end_hyps = hyps[:]
@@ -283,10 +283,14 @@ class RNNEncoder(EncoderBase):
                  'ys_sub2': {'xs': None, 'xlens': None}}
 
         # Sort by lenghts in the descending order for pack_padded_sequence
+        # NOTE: skip this if mini-batches have already been sorted in the dataset
+        perm_ids_unsort = None
         if not self.lc_bidir:
-            xlens, perm_ids = torch.IntTensor(xlens).sort(0, descending=True)
-            xs = xs[perm_ids]
-            _, perm_ids_unsort = perm_ids.sort()
+            xlens = torch.IntTensor(xlens)
+            if (xlens[:-1] < xlens[1:]).any():
+                xlens, perm_ids = xlens.sort(0, descending=True)
+                xs = xs[perm_ids]
+                _, perm_ids_unsort = perm_ids.sort()
 
         # Dropout for inputs-hidden connection
         xs = self.dropout_in(xs)
@@ -314,7 +318,8 @@ class RNNEncoder(EncoderBase):
                 return eouts
         else:
             for lth in range(self.n_layers):
-                self.rnn[lth].flatten_parameters()  # for multi-GPUs
+                if xs.is_cuda:
+                    self.rnn[lth].flatten_parameters()  # for multi-GPUs
                 xs, state = self.padding(xs, xlens, self.rnn[lth],
                                          prev_state=self.hx_fwd[lth],
                                          streaming=streaming)
@@ -345,7 +350,7 @@ class RNNEncoder(EncoderBase):
             xs = self.bridge(xs)
 
         # Unsort
-        if not self.lc_bidir:
+        if perm_ids_unsort is not None:
             xs = xs[perm_ids_unsort]
             xlens = xlens[perm_ids_unsort]
 
@@ -371,8 +376,9 @@ class RNNEncoder(EncoderBase):
         # full context BPTT
         if self.chunk_size_left <= 0:
             for lth in range(self.n_layers):
-                self.rnn[lth].flatten_parameters()  # for multi-GPUs
-                self.rnn_bwd[lth].flatten_parameters()  # for multi-GPUs
+                if xs.is_cuda:
+                    self.rnn[lth].flatten_parameters()  # for multi-GPUs
+                    self.rnn_bwd[lth].flatten_parameters()  # for multi-GPUs
                 # bwd
                 xs_bwd = torch.flip(xs, dims=[1])
                 xs_bwd, _ = self.rnn_bwd[lth](xs_bwd, hx=None)
@@ -421,8 +427,9 @@ class RNNEncoder(EncoderBase):
             _N_l = N_l
 
             for lth in range(self.n_layers):
-                self.rnn[lth].flatten_parameters()  # for multi-GPUs
-                self.rnn_bwd[lth].flatten_parameters()  # for multi-GPUs
+                if xs_chunk.is_cuda:
+                    self.rnn[lth].flatten_parameters()  # for multi-GPUs
+                    self.rnn_bwd[lth].flatten_parameters()  # for multi-GPUs
                 # bwd
                 xs_chunk_bwd = torch.flip(xs_chunk, dims=[1])
                 xs_chunk_bwd, _ = self.rnn_bwd[lth](xs_chunk_bwd, hx=None)
@@ -477,14 +484,17 @@ class RNNEncoder(EncoderBase):
 
     def sub_module(self, xs, xlens, perm_ids_unsort, module='sub1'):
         if self.task_specific_layer:
-            getattr(self, 'rnn_' + module).flatten_parameters()  # for multi-GPUs
+            if xs.is_cuda:
+                getattr(self, 'rnn_' + module).flatten_parameters()  # for multi-GPUs
             xs_sub, _ = self.padding(xs, xlens, getattr(self, 'rnn_' + module))
             xs_sub = self.dropout(xs_sub)
-        else:
+        elif perm_ids_unsort is not None:
             xs_sub = xs.clone()[perm_ids_unsort]
+        else:
+            xs_sub = xs.clone()
         if getattr(self, 'bridge_' + module) is not None:
             xs_sub = getattr(self, 'bridge_' + module)(xs_sub)
-        xlens_sub = xlens[perm_ids_unsort]
+        xlens_sub = xlens[perm_ids_unsort] if perm_ids_unsort is not None else xlens.clone()
         return xs_sub, xlens_sub
 
 
@@ -34,31 +34,22 @@ def splice(feat, n_splices=1, n_stacks=1, dtype=np.float32):
 
     max_xlen, input_dim = feat.shape
     freq = (input_dim // 3) // n_stacks
-    feat_splice = np.zeros((max_xlen, freq * (n_splices * n_stacks) * 3), dtype=dtype)
-
-    for i_time in range(max_xlen):
-        spliced_frames = np.zeros((n_splices * n_stacks, freq, 3))
-        for i_splice in range(0, n_splices, 1):
-            if i_time <= n_splices - 1 and i_splice < n_splices - i_time:
-                # copy the first frame to left side (padding left frames)
-                copy_frame = feat[0]
-            elif max_xlen - n_splices <= i_time and i_time + (i_splice - n_splices) > max_xlen - 1:
-                # copy the last frame to right side (padding right frames)
-                copy_frame = feat[-1]
-            else:
-                copy_frame = feat[i_time + (i_splice - n_splices)]
-
-            # `[freq * 3 * n_stacks]` -> `[freq, 3, n_stacks]`
-            copy_frame = copy_frame.reshape((freq, 3, n_stacks))
-
-            # `[freq, 3, n_stacks]` -> `[n_stacks, freq, 3]`
-            copy_frame = np.transpose(copy_frame, (2, 0, 1))
-
-            spliced_frames[i_splice: i_splice + n_stacks] = copy_frame
-
-        # `[n_splices * n_stacks, freq, 3] -> `[freq, n_splices * n_stacks, 3]`
-        spliced_frames = np.transpose(spliced_frames, (1, 0, 2))
-
-        feat_splice[i_time] = spliced_frames.reshape((freq * (n_splices * n_stacks) * 3))
+    n_frames = n_splices * n_stacks
+
+    # `[T, freq * 3 * n_stacks]` -> `[T, freq, 3, n_stacks]`
+    feat = feat.reshape((max_xlen, freq, 3, n_stacks))
+
+    # NOTE: fill each spliced frame for all time steps at once instead of looping over time
+    # The i_splice-th neighbor of each frame is copied to [i_splice, i_splice + n_stacks), and
+    # later neighbors overwrite the earlier ones. The remaining frames are left as zeros.
+    spliced_frames = np.zeros((max_xlen, n_frames, freq, 3), dtype=dtype)
+    for i_frame in range(min(n_frames, n_splices + n_stacks - 1)):
+        i_splice = min(i_frame, n_splices - 1)
+        # copy the first frame to left side (padding left frames)
+        src = np.maximum(np.arange(max_xlen) + (i_splice - n_splices), 0)
+        spliced_frames[:, i_frame] = feat[src, :, :, i_frame - i_splice]
+
+    # `[T, n_splices * n_stacks, freq, 3] -> `[T, freq, n_splices * n_stacks, 3]`
+    feat_splice = np.transpose(spliced_frames, (0, 2, 1, 3)).reshape((max_xlen, freq * n_frames * 3))
 
     return feat_splice
@@ -90,6 +90,12 @@ class Speech2Text(ModelBase):
 
         # for discourse-aware model
         self.utt_id_prev = None
+        # NOTE: decoder states are carried over to the training stage in discourse-aware models,
+        # so they must not be created in torch.inference_mode
+        self.inference_mode_enabled = not getattr(args, 'discourse_aware', False)
+
+        # encoder outputs of the latest mini-batch in the inference stage
+        self.eout_cache = None
 
         # Feature extraction
         self.input_noise_std = args.input_noise_std
@@ -239,9 +245,12 @@ class Speech2Text(ModelBase):
             observation (dict):
 
         """
+        # NOTE: parameters will be updated
+        self.eout_cache = None
+
         if is_eval:
             self.eval()
-            with torch.no_grad():
+            with self.inference_mode(self.inference_mode_enabled):
                 loss, observation = self._forward(batch, task)
         else:
             self.train()
@@ -253,9 +262,9 @@ class Speech2Text(ModelBase):
         # Encode input features
         if self.input_type == 'speech':
             if self.mtl_per_batch:
-                eout_dict = self.encode(batch['xs'], task)
+                eout_dict = self.encode(batch['xs'], task, xs_pad=batch.get('xs_pad'))
             else:
-                eout_dict = self.encode(batch['xs'], 'all')
+                eout_dict = self.encode(batch['xs'], 'all', xs_pad=batch.get('xs_pad'))
         else:
             eout_dict = self.encode(batch['ys_sub1'])
 
@@ -265,13 +274,16 @@ class Speech2Text(ModelBase):
         # for the forward decoder in the main task
         if (self.fwd_weight > 0 or (self.bwd_weight == 0 and self.ctc_weight > 0) or self.mbr_training) and task in ['all', 'ys', 'ys.ctc', 'ys.mbr']:
             teacher_logits = None
+            # NOTE: teachers are not updated, so do not keep their graphs for backward
             if teacher is not None:
                 teacher.eval()
-                teacher_logits = teacher.generate_logits(batch)
+                with torch.no_grad():
+                    teacher_logits = teacher.generate_logits(batch)
                 # TODO(hirofumi): label smoothing, scheduled sampling, dropout?
             elif teacher_lm is not None:
                 teacher_lm.eval()
-                teacher_logits = self.generate_lm_logits(batch['ys'], lm=teacher_lm)
+                with torch.no_grad():
+                    teacher_logits = self.generate_lm_logits(batch['ys'], lm=teacher_lm)
 
             loss_fwd, obs_fwd = self.dec_fwd(eout_dict['ys']['xs'], eout_dict['ys']['xlens'],
                                              batch['ys'], task,
@@ -347,7 +359,8 @@ class Speech2Text(ModelBase):
         logits = lm.output(lmout)
         return logits
 
-    def encode(self, xs, task='all', streaming=False, lookback=False, lookahead=False):
+    def encode(self, xs, task='all', streaming=False, lookback=False, lookahead=False,
+               xs_pad=None):
         """Encode acoustic or text features.
 
         Args:
@@ -356,6 +369,7 @@ class Speech2Text(ModelBase):
             streaming (bool): streaming encoding
             lookback (bool): truncate leftmost frames for lookback in CNN context
             lookahead (bool): truncate rightmost frames for lookahead in CNN context
+            xs_pad (np.ndarray or FloatTensor): xs padded in advance, of size `[B, T, input_dim]`
         Returns:
             eout_dict (dict):
 
@@ -370,7 +384,15 @@ class Speech2Text(ModelBase):
                 xs = [splice(x, self.n_splices, self.n_stacks) for x in xs]
 
             xlens = torch.IntTensor([len(x) for x in xs])
-            xs = pad_list([np2tensor(x, self.device).float() for x in xs], 0.)
+            if xs_pad is not None and self.n_stacks == 1 and self.n_splices == 1:
+                if not torch.is_tensor(xs_pad):
+                    xs_pad = torch.from_numpy(xs_pad)
+                # NOTE: asynchronous if xs_pad is in page-locked memory
+                # NOTE: always copy since SpecAugment and input noise modify xs in-place,
+                # and xs_pad in the mini-batch may be used more than once (e.g., per task)
+                xs = xs_pad.to(self.device, dtype=torch.float32, non_blocking=True, copy=True)
+            else:
+                xs = pad_list([np2tensor(x, self.device).float() for x in xs], 0.)
 
             # SpecAugment
             if self.specaug is not None and self.training:
@@ -400,15 +422,40 @@ class Speech2Text(ModelBase):
 
         if self.main_weight < 1 and self.enc_type in ['conv', 'tds', 'gated_conv']:
             for sub in ['sub1', 'sub2']:
-                eout_dict['ys_' + sub]['xs'] = eout_dict['ys']['xs'].clone()
+                # NOTE: share encoder outputs without copying since decoders never modify them in-place
+                eout_dict['ys_' + sub]['xs'] = eout_dict['ys']['xs']
                 eout_dict['ys_' + sub]['xlens'] = eout_dict['ys']['xlens'][:]
 
         return eout_dict
 
-    def get_ctc_probs(self, xs, task='ys', temperature=1, topk=None):
+    def encode_cached(self, xs, task='all', utt_ids=None):
+        """Encode acoustic or text features in the inference stage.
+           Encoder outputs are reused when the same inputs of the same utterances are fed again.
+
+        Args:
+            xs (list): A list of length `[B]`, which contains Tensor of size `[T, input_dim]`
+            task (str): all/ys*/ys_sub1*/ys_sub2*
+            utt_ids (list): name of utterances used as the cache key
+        Returns:
+            eout_dict (dict):
+
+        """
+        key = None
+        if utt_ids is not None and len(utt_ids) == len(xs):
+            # NOTE: xs are kept in the cache so that their ids are not reused by other inputs
+            key = (task, tuple(utt_ids), tuple(id(x) for x in xs), tuple(np.shape(x) for x in xs))
+        if key is not None and self.eout_cache is not None and self.eout_cache[0] == key:
+            return self.eout_cache[2]
+
+        eout_dict = self.encode(xs, task)
+        if key is not None:
+            self.eout_cache = (key, xs, eout_dict)
+        return eout_dict
+
+    def get_ctc_probs(self, xs, task='ys', temperature=1, topk=None, utt_ids=None):
         self.eval()
-        with torch.no_grad():
-            eout_dict = self.encode(xs, task)
+        with self.inference_mode(self.inference_mode_enabled):
+            eout_dict = self.encode_cached(xs, task, utt_ids)
             dir = 'fwd' if self.fwd_weight >= self.bwd_weight else 'bwd'
             if task == 'ys_sub1':
                 dir += '_sub1'
@@ -466,7 +513,7 @@ class Speech2Text(ModelBase):
         stdout = False
 
         self.eval()
-        with torch.no_grad():
+        with self.inference_mode(self.inference_mode_enabled):
             lm = getattr(self, 'lm_fwd', None)
             lm_second = getattr(self, 'lm_second', None)
 
@@ -527,7 +574,7 @@ class Speech2Text(ModelBase):
                         elens = torch.IntTensor([eout.size(1)])
                         ctc_log_probs = None
                         if params['recog_ctc_weight'] > 0:
-                            ctc_log_probs = torch.log(self.dec_fwd.ctc_probs(eout))
+                            ctc_log_probs = self.dec_fwd.ctc_log_probs(eout)
                         nbest_hyps_id_offline = self.dec_fwd.beam_search(
                             eout, elens, global_params, idx2token, lm, lm_second,
                             ctc_log_probs=ctc_log_probs)[0]
@@ -637,12 +684,9 @@ class Speech2Text(ModelBase):
             self.utt_id_prev = utt_ids[0]
 
         self.eval()
-        with torch.no_grad():
+        with self.inference_mode(self.inference_mode_enabled):
             # Encode input features
-            if self.input_type == 'speech' and self.mtl_per_batch and 'bwd' in dir:
-                eout_dict = self.encode(xs, task)
-            else:
-                eout_dict = self.encode(xs, task)
+            eout_dict = self.encode_cached(xs, task, utt_ids)
 
             # CTC
             if (self.fwd_weight == 0 and self.bwd_weight == 0) or (self.ctc_weight > 0 and params['recog_ctc_weight'] == 1):
@@ -662,14 +706,14 @@ class Speech2Text(ModelBase):
                     params['recog_max_len_ratio'], idx2token,
                     exclude_eos, refs_id, utt_ids, speakers)
             else:
-                assert params['recog_batch_size'] == 1
-
+                # NOTE: utterances are encoded in parallel, and beam search is performed per utterance
                 ctc_log_probs = None
                 if params['recog_ctc_weight'] > 0:
                     ctc_log_probs = self.dec_fwd.ctc_log_probs(eout_dict[task]['xs'])
 
                 # forward-backward decoding
                 if params['recog_fwd_bwd_attention']:
+                    assert params['recog_batch_size'] == 1
                     lm_fwd = getattr(self, 'lm_fwd', None)
                     lm_bwd = getattr(self, 'lm_bwd', None)
 
@@ -116,12 +116,12 @@ def append_sos_eos(ys, sos, eos, pad, device, bwd=False, replace_sos=False):
     ys = [np2tensor(np.fromiter(y[::-1] if bwd else y, dtype=np.int64),
                     device) for y in ys]
     if replace_sos:
-        ylens = np2tensor(np.fromiter([y[1:].size(0) + 1 for y in ys], dtype=np.int32))  # +1 for <eos>
+        ylens = torch.tensor([y[1:].size(0) + 1 for y in ys], dtype=torch.int32)  # +1 for <eos>
         ys_in = pad_list([y for y in ys], pad)
         ys_out = pad_list([torch.cat([y[1:], _eos], dim=0) for y in ys], pad)
     else:
         _sos = torch.zeros(1, dtype=torch.int64, device=device).fill_(sos)
-        ylens = np2tensor(np.fromiter([y.size(0) + 1 for y in ys], dtype=np.int32))  # +1 for <eos>
+        ylens = torch.tensor([y.size(0) + 1 for y in ys], dtype=torch.int32)  # +1 for <eos>
         ys_in = pad_list([torch.cat([_sos, y], dim=0) for y in ys], pad)
         ys_out = pad_list([torch.cat([y, _eos], dim=0) for y in ys], pad)
     return ys_in, ys_out, ylens
@@ -99,9 +99,24 @@ class LRScheduler(object):
     def is_early_stop(self):
         return self.not_improved_n_epochs >= self.early_stop_patient_n_epochs
 
-    def step(self):
+    def step(self, scaler=None):
+        """Update parameters and learning rate.
+
+        Args:
+            scaler (torch.cuda.amp.GradScaler): gradient scaler for mixed precision training
+
+        """
+        if scaler is not None:
+            scale = scaler.get_scale()
+            scaler.step(self.optimizer)
+            scaler.update()
+            # NOTE: GradScaler skips the optimizer step and decreases the loss scale
+            # when gradients contain inf/NaN. Keep the learning rate schedule as is then.
+            if scaler.get_scale() < scale:
+                return
+        else:
+            self.optimizer.step()
         self._step += 1
-        self.optimizer.step()
         if self.noam:
             self._noam_lr()
         else:
@@ -179,7 +194,7 @@ class LRScheduler(object):
                 param_group['lr'] = self.lr
 
     def save_checkpoint(self, model, save_path, remove_old=True, amp=None,
-                        epoch_detail=None):
+                        epoch_detail=None, scaler=None):
         """Save checkpoint.
 
         Args:
@@ -190,6 +205,7 @@ class LRScheduler(object):
                 worse than the top-k ones are deleted
             amp ():
             epoch_detail (float): fine-grained epoch (used for MBR training)
+            scaler (torch.cuda.amp.GradScaler): gradient scaler for mixed precision training
 
         """
         if epoch_detail is None:
@@ -212,6 +228,8 @@ class LRScheduler(object):
         }
         if amp is not None:
             checkpoint['amp_state_dict'] = amp.state_dict()
+        if scaler is not None:
+            checkpoint['scaler_state_dict'] = scaler.state_dict()
         torch.save(checkpoint, model_path)
 
         logger.info("=> Saved checkpoint (epoch:%s): %s" % (str(epoch_detail), model_path))
@@ -35,7 +35,8 @@ class Reporter(object):
         self.save_path = save_path
 
         # tensorboard
-        self.tf_writer = SummaryWriter(save_path)
+        # NOTE: events are queued and written to the disk in the background
+        self.tf_writer = SummaryWriter(save_path, max_queue=100, flush_secs=60)
 
         # report per step
         self._step = 0
@@ -92,10 +93,6 @@ class Reporter(object):
         """Add scalar value to tensorboard."""
         self.tf_writer.add_scalar(key, value, self._step)
 
-    def add_tensorboard_histogram(self, key, value):
-        """Add histogram value to tensorboard."""
-        self.tf_writer.add_histogram(key, value, self._step)
-
     def step(self, is_eval=False):
         self._step += 1
         if is_eval:
@@ -0,0 +1,123 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for the ASR dataset."""
+
+import codecs
+import kaldiio
+import numpy as np
+import os
+import pytest
+
+from neural_sp.datasets.asr import Dataset
+
+INPUT_DIM = 4
+N_UTTS = 6
+
+
+def make_corpus(data_dir, seed=0):
+    """Write features, a tsv file and a dictionary of a dummy corpus."""
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.RandomState(seed)
+    feats = {'utt%d' % u: rng.randn(20 + u, INPUT_DIM).astype(np.float32) for u in range(N_UTTS)}
+    ark_path = os.path.join(data_dir, 'feats.ark')
+    scp_path = os.path.join(data_dir, 'feats.scp')
+    kaldiio.save_ark(ark_path, feats, scp=scp_path)
+    with codecs.open(scp_path, 'r', 'utf-8') as f:
+        feat_paths = dict(line.strip().split(None, 1) for line in f)
+
+    dict_path = os.path.join(data_dir, 'dict.txt')
+    with codecs.open(dict_path, 'w', 'utf-8') as f:
+        for i, c in enumerate(['<unk>', '<eos>', '<pad>', 'a', 'b', 'c']):
+            f.write('%s %d\n' % (c, i + 1))
+
+    tsv_path = os.path.join(data_dir, 'train.tsv')
+    with codecs.open(tsv_path, 'w', 'utf-8') as f:
+        f.write('utt_id\tspeaker\tfeat_path\txlen\txdim\ttext\ttoken_id\tylen\tydim\n')
+        for utt_id, feat in feats.items():
+            f.write('%s\tspk\t%s\t%d\t%d\tabc\t4 5 6\t3\t7\n' %
+                    (utt_id, feat_paths[utt_id], len(feat), INPUT_DIM))
+    return tsv_path, dict_path, feats
+
+
+def make_dataset(tsv_path, dict_path, **kwargs):
+    return Dataset(tsv_path=tsv_path, dict_path=dict_path, unit='char', batch_size=2,
+                   sort_by='input', min_n_frames=1, **kwargs)
+
+
+def load_all(dataset):
+    feats = {}
+    dataset.reset()
+    while True:
+        batch, is_new_epoch = dataset.next()
+        for utt_id, x in zip(batch['utt_ids'], batch['xs']):
+            feats[utt_id] = np.array(x)
+        if is_new_epoch:
+            return feats
+
+
+def test_feat_cache(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    tsv_path1, dict_path1, feats1 = make_corpus(str(tmp_path / 'exp1'), seed=0)
+    # same tsv basename and utterance IDs, but different features
+    tsv_path2, dict_path2, feats2 = make_corpus(str(tmp_path / 'exp2'), seed=1)
+
+    dataset1 = make_dataset(tsv_path1, dict_path1, feat_cache_dir=cache_dir)
+    dataset2 = make_dataset(tsv_path2, dict_path2, feat_cache_dir=cache_dir)
+    for _ in range(2):
+        # the first pass writes cache files, and the second pass reads them
+        for dataset, feats in [(dataset1, feats1), (dataset2, feats2)]:
+            out = load_all(dataset)
+            assert out.keys() == feats.keys()
+            for utt_id in feats:
+                assert np.array_equal(out[utt_id], feats[utt_id])
+    assert len(os.listdir(os.path.join(cache_dir, 'train'))) == N_UTTS * 2
+
+
+def test_feat_cache_invalid(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    tsv_path, dict_path, feats = make_corpus(str(tmp_path / 'exp'))
+    dataset = make_dataset(tsv_path, dict_path, feat_cache_dir=cache_dir)
+    load_all(dataset)
+
+    # a cache file not matching the number of frames in the tsv is overwritten
+    cache_path = os.path.join(cache_dir, 'train', sorted(os.listdir(os.path.join(cache_dir, 'train')))[0])
+    np.save(cache_path, np.zeros((1, INPUT_DIM), dtype=np.float32))
+    out = load_all(dataset)
+    for utt_id in feats:
+        assert np.array_equal(out[utt_id], feats[utt_id])
+    assert len(np.load(cache_path)) > 1
+
+
+def test_shuffle_seed(tmp_path):
+    tsv_path, dict_path, _ = make_corpus(str(tmp_path / 'exp'))
+
+    def utt_ids(seed, global_seed=0):
+        np.random.seed(global_seed)
+        dataset = Dataset(tsv_path=tsv_path, dict_path=dict_path, unit='char', batch_size=2,
+                          sort_by='shuffle', min_n_frames=1, seed=seed)
+        return list(dataset.df['utt_id'])
+
+    assert utt_ids(1) == utt_ids(1)
+    # the global random generator must not affect the order
+    assert utt_ids(1) == utt_ids(1, global_seed=1)
+    assert sorted(utt_ids(1)) == sorted(utt_ids(2))
+    assert any(utt_ids(seed) != utt_ids(1) for seed in range(2, 6))
+
+
+def test_token_ids(tmp_path):
+    tsv_path, dict_path, _ = make_corpus(str(tmp_path / 'exp'))
+    dataset = make_dataset(tsv_path, dict_path)
+    batch, _ = dataset.next()
+    for y in batch['ys']:
+        assert y.dtype == np.int32
+        assert y.tolist() == [4, 5, 6]
+
+    # malformed token IDs are not silently truncated
+    with codecs.open(tsv_path, 'r', 'utf-8') as f:
+        lines = f.readlines()
+    with codecs.open(tsv_path, 'w', 'utf-8') as f:
+        f.write(''.join(lines).replace('\t4 5 6\t', '\t4 x 6\t'))
+    dataset = make_dataset(tsv_path, dict_path)
+    with pytest.raises(ValueError):
+        dataset.next()
@@ -0,0 +1,47 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for the character-level token converter."""
+
+import codecs
+import pytest
+
+from neural_sp.datasets.token_converter.character import Char2idx
+
+TOKENS = ['<unk>', '<eos>', '<pad>', '<space>', 'a', 'b', 'c', 'あ', '。']
+TEXTS = [
+    '',
+    'abc',
+    'a b c',
+    ' ab  c ',
+    'abz',  # unknown character
+    'a€b',  # unknown character beyond the lookup table
+    'あ。a b',
+    'ab<space>c',
+]
+
+
+@pytest.fixture
+def dict_paths(tmp_path):
+    dict_path = str(tmp_path / 'dict.txt')
+    with codecs.open(dict_path, 'w', 'utf-8') as f:
+        for i, c in enumerate(TOKENS):
+            f.write('%s %d\n' % (c, i + 1))
+    # NOTE: non-linguistic symbols disable the fast path
+    nlsyms = str(tmp_path / 'nlsyms.txt')
+    with codecs.open(nlsyms, 'w', 'utf-8') as f:
+        f.write('<never-appear>\n')
+    return dict_path, nlsyms
+
+
+@pytest.mark.parametrize("remove_space", [False, True])
+@pytest.mark.parametrize("remove_list", [[], ['a'], ['a', 'あ']])
+def test_fast_path(dict_paths, remove_space, remove_list):
+    dict_path, nlsyms = dict_paths
+    char2idx = Char2idx(dict_path, remove_space=remove_space, remove_list=remove_list)
+    char2idx_slow = Char2idx(dict_path, nlsyms=nlsyms, remove_space=remove_space, remove_list=remove_list)
+
+    for text in TEXTS:
+        token_ids = char2idx(text)
+        assert token_ids == char2idx_slow(text)
+        assert all(isinstance(i, int) for i in token_ids)
@@ -0,0 +1,96 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for prefetching mini-batches in a background thread."""
+
+import copy
+import numpy as np
+import pytest
+import torch
+
+from neural_sp.datasets.prefetcher import Prefetcher
+
+N_BATCHES = 4
+
+
+class DummyDataset(object):
+    """Iterate over a fixed number of mini-batches per epoch."""
+
+    def __init__(self, n_epochs=2, error_at=-1):
+        self.n_epochs = n_epochs
+        self.error_at = error_at
+        self.epoch = 0
+        self.offset = 0
+        self.iteration = 0
+
+    @property
+    def epoch_detail(self):
+        return self.epoch + self.offset / N_BATCHES
+
+    def reset(self):
+        self.offset = 0
+
+    def next(self, batch_size=1):
+        if self.epoch >= self.n_epochs:
+            raise StopIteration
+        if self.iteration == self.error_at:
+            raise ValueError('broken mini-batch')
+        mini_batch = {'xs_pad': np.full((batch_size, 3, 2), self.iteration, dtype=np.float32),
+                      'iteration': self.iteration}
+        self.iteration += 1
+        self.offset += 1
+        is_new_epoch = self.offset == N_BATCHES
+        if is_new_epoch:
+            self.reset()
+            self.epoch += 1
+        return mini_batch, is_new_epoch
+
+
+@pytest.mark.parametrize("max_size", [1, 3])
+def test_epoch_detail(max_size):
+    dataset = DummyDataset()
+    reference = copy.deepcopy(dataset)
+    loader = Prefetcher(dataset, max_size=max_size)
+    for _ in range(dataset.n_epochs * N_BATCHES):
+        mini_batch, is_new_epoch, epoch_detail = loader.next()
+        mini_batch_ref, is_new_epoch_ref = reference.next()
+        assert mini_batch['iteration'] == mini_batch_ref['iteration']
+        assert is_new_epoch == is_new_epoch_ref
+        # the progress right after this mini-batch, not that of the dataset running ahead
+        assert epoch_detail == reference.epoch_detail
+
+
+def test_stop_iteration():
+    loader = Prefetcher(DummyDataset(n_epochs=1))
+    for _ in range(N_BATCHES):
+        loader.next()
+    with pytest.raises(StopIteration):
+        loader.next()
+
+
+def test_exception():
+    loader = Prefetcher(DummyDataset(error_at=2))
+    for _ in range(2):
+        loader.next()
+    with pytest.raises(ValueError, match='broken mini-batch'):
+        loader.next()
+
+
+def test_kwargs_and_pin_memory():
+    loader = Prefetcher(DummyDataset(), pin_memory=torch.cuda.is_available(), batch_size=2)
+    mini_batch = loader.next()[0]
+    assert mini_batch['xs_pad'].shape == (2, 3, 2)
+    if torch.cuda.is_available():
+        assert mini_batch['xs_pad'].is_pinned()
+
+
+def test_snapshot():
+    dataset = DummyDataset(n_epochs=100)
+    loader = Prefetcher(dataset)
+    loader.next()
+    snapshot = loader.snapshot()
+    snapshot.reset()
+    for _ in range(N_BATCHES):
+        snapshot.next()
+    # the wrapped dataset is not affected by iterating the snapshot
+    assert [loader.next()[0]['iteration'] for _ in range(3)] == [1, 2, 3]
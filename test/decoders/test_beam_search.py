@@ -0,0 +1,120 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for utility functions of beam search decoding."""
+
+import importlib
+import pytest
+import torch
+
+from neural_sp.models.seq2seq.decoders.beam_search import BeamSearch
+
+ENC_N_UNITS = 32
+EOS = 2
+
+
+def make_hyps(scores, ended=False):
+    return [{'hyp': [EOS, 4] + ([EOS] if ended else []), 'score': s} for s in scores]
+
+
+def test_prune_by_score():
+    helper = BeamSearch(beam_width=4, eos=EOS, ctc_weight=0, device='cpu')
+    hyps = make_hyps([-1.0, -1.5, -2.0, -3.5])
+    assert helper.prune_by_score(hyps, 0.0) is hyps
+    assert [h['score'] for h in helper.prune_by_score(hyps, 1.0)] == [-1.0, -1.5, -2.0]
+    assert [h['score'] for h in helper.prune_by_score(hyps, 0.1)] == [-1.0]
+    assert helper.prune_by_score([], 1.0) == []
+
+
+@pytest.mark.parametrize(
+    "active, ended, n_remaining_steps, lp_weight, nbest, is_finish",
+    [
+        ([-3.0, -4.0], [-2.0], 10, 0., 1, True),
+        ([-3.0, -4.0], [-3.0], 10, 0., 1, False),  # ties can still replace the ended one
+        ([-1.0, -4.0], [-2.0], 10, 0., 1, False),
+        ([-3.0, -4.0], [-2.0, -5.0], 10, 0., 2, False),
+        ([-3.0, -4.0], [-2.0, -2.5], 10, 0., 2, True),
+        ([-3.0, -4.0], [-2.0], 1, 0.5, 1, True),
+        ([-3.0, -4.0], [-2.0], 3, 0.5, 1, False),  # length reward in the remaining steps
+        ([-3.0, -4.0], [], 10, 0., 1, False),
+        ([], [-2.0], 10, 0., 1, False),
+    ]
+)
+def test_is_finish_early(active, ended, n_remaining_steps, lp_weight, nbest, is_finish):
+    helper = BeamSearch(beam_width=4, eos=EOS, ctc_weight=0, device='cpu')
+    out = helper.is_finish_early(make_hyps(active), make_hyps(ended, ended=True),
+                                 n_remaining_steps, lp_weight, nbest)
+    assert out == is_finish
+
+
+def make_decoder(dec_type, seed):
+    torch.manual_seed(seed)
+    if dec_type == 'las':
+        test_module = importlib.import_module('test_las_decoder')
+        module = importlib.import_module('neural_sp.models.seq2seq.decoders.las')
+        args = test_module.make_args(param_init=1.0)
+        dec = module.RNNDecoder(**args)
+    else:
+        test_module = importlib.import_module('test_transformer_decoder')
+        module = importlib.import_module('neural_sp.models.seq2seq.decoders.transformer')
+        args = test_module.make_args()
+        dec = module.TransformerDecoder(**args)
+        # make output distributions peaky so that hypotheses end at different steps
+        with torch.no_grad():
+            dec.output.weight.mul_(5)
+    dec.eval()
+    return dec, test_module
+
+
+@pytest.mark.parametrize("dec_type", ['las', 'transformer'])
+@pytest.mark.parametrize(
+    "params",
+    [
+        ({'recog_beam_width': 4, 'nbest': 1}),
+        ({'recog_beam_width': 4, 'nbest': 2}),
+        ({'recog_beam_width': 4, 'nbest': 1, 'recog_length_penalty': 0.1}),
+        ({'recog_beam_width': 4, 'nbest': 1, 'recog_ctc_weight': 0.3}),
+        ({'recog_beam_width': 4, 'nbest': 1, 'recog_beam_threshold': 2.0}),
+    ]
+)
+def test_early_stop(monkeypatch, dec_type, params):
+    """Early stopping must return the same N-best as the full search."""
+    emax = 40
+    n_early_stops = 0
+    for seed in range(8):
+        dec, test_module = make_decoder(dec_type, seed)
+        params_b = test_module.make_decode_params(
+            recog_min_len_ratio=0.0, recog_eos_threshold=1.0, **params)
+        eouts = torch.randn(1, emax, ENC_N_UNITS)
+        elens = torch.IntTensor([emax])
+        ctc_log_probs = None
+        if params_b['recog_ctc_weight'] > 0:
+            ctc_log_probs = torch.log_softmax(torch.randn(1, emax, test_module.VOCAB), dim=-1)
+
+        def decode():
+            with torch.no_grad():
+                nbest_hyps, _, scores = dec.beam_search(
+                    eouts, elens, params_b, ctc_log_probs=ctc_log_probs,
+                    nbest=params_b['nbest'])
+            return [h.tolist() for h in nbest_hyps[0]], scores[0]
+
+        with monkeypatch.context() as m:
+            m.setattr(BeamSearch, 'is_finish_early', lambda *args, **kwargs: False)
+            hyps_full, scores_full = decode()
+
+        is_finish_early = BeamSearch.is_finish_early
+        calls = []
+
+        def is_finish_early_counted(*args, **kwargs):
+            calls.append(is_finish_early(*args, **kwargs))
+            return calls[-1]
+
+        with monkeypatch.context() as m:
+            m.setattr(BeamSearch, 'is_finish_early', is_finish_early_counted)
+            hyps, scores = decode()
+        n_early_stops += any(calls)
+
+        assert hyps == hyps_full
+        assert scores == pytest.approx(scores_full)
+    # the search must actually stop early in some cases for this test to be meaningful
+    assert n_early_stops > 0
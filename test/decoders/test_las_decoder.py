@@ -180,6 +180,7 @@ def make_decode_params(**kwargs):
         recog_length_norm=False,
         recog_gnmt_decoding=False,
         recog_eos_threshold=1.5,
+        recog_beam_threshold=0.0,
         recog_asr_state_carry_over=False,
         recog_lm_state_carry_over=False,
         recog_softmax_smoothing=1.0,
@@ -229,6 +230,7 @@ def make_args_rnnlm(**kwargs):
         (False, '', {'recog_beam_width': 4, 'nbest': 4}),
         (False, '', {'recog_beam_width': 4, 'nbest': 4, 'softmax_smoothing': 2.0}),
         (False, '', {'recog_beam_width': 4, 'recog_ctc_weight': 0.1}),
+        (False, '', {'recog_beam_width': 4, 'recog_beam_threshold': 1.0}),
         # length penalty
         (False, '', {'recog_length_penalty': 0.1}),
         (False, '', {'recog_length_penalty': 0.1, 'recog_gnmt_decoding': True}),
@@ -256,6 +258,7 @@ def make_args_rnnlm(**kwargs):
         (True, '', {'recog_beam_width': 4, 'nbest': 4}),
         (True, '', {'recog_beam_width': 4, 'nbest': 4, 'softmax_smoothing': 2.0}),
         (True, '', {'recog_beam_width': 4, 'recog_ctc_weight': 0.1}),
+        (True, '', {'recog_beam_width': 4, 'recog_beam_threshold': 1.0}),
         # length penalty
         (True, '', {'recog_length_penalty': 0.1}),
         (True, '', {'recog_length_penalty': 0.1, 'recog_gnmt_decoding': True}),
@@ -156,6 +156,7 @@ def make_decode_params(**kwargs):
         recog_coverage_threshold=1.0,
         recog_length_norm=False,
         recog_eos_threshold=1.5,
+        recog_beam_threshold=0.0,
         recog_asr_state_carry_over=False,
         recog_lm_state_carry_over=False,
         recog_softmax_smoothing=1.0,
@@ -208,6 +209,7 @@ def make_args_rnnlm(**kwargs):
         (False, {'recog_beam_width': 4, 'nbest': 4}),
         (False, {'recog_beam_width': 4, 'nbest': 4, 'softmax_smoothing': 2.0}),
         (False, {'recog_beam_width': 4, 'recog_ctc_weight': 0.1}),
+        (False, {'recog_beam_width': 4, 'recog_beam_threshold': 1.0}),
         # length penalty
         (False, {'recog_length_penalty': 0.1}),
         (False, {'recog_length_norm': True}),
@@ -230,6 +232,7 @@ def make_args_rnnlm(**kwargs):
         (True, {'recog_beam_width': 4, 'nbest': 4}),
         (True, {'recog_beam_width': 4, 'nbest': 4, 'softmax_smoothing': 2.0}),
         (True, {'recog_beam_width': 4, 'recog_ctc_weight': 0.1}),
+        (True, {'recog_beam_width': 4, 'recog_beam_threshold': 1.0}),
     ]
 )
 def test_decoding(backward, params):
@@ -331,3 +334,48 @@ def test_decoding(backward, params):
             assert isinstance(scores, list)
             assert len(scores) == batch_size
             assert len(scores[0]) == params['nbest']
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        ({'recog_beam_width': 1}),
+        ({'recog_beam_width': 4}),
+        ({'recog_beam_width': 4, 'nbest': 4}),
+    ]
+)
+def test_decoding_cache_states(params):
+    args = make_args()
+    params = make_decode_params(**params)
+
+    batch_size = params['recog_batch_size']
+    emax = 40
+    device = "cpu"
+
+    eouts = np.random.randn(batch_size, emax, ENC_N_UNITS).astype(np.float32)
+    elens = torch.IntTensor([len(x) for x in eouts])
+    eouts = pad_list([np2tensor(x, device).float() for x in eouts], 0.)
+
+    module = importlib.import_module('neural_sp.models.seq2seq.decoders.transformer')
+    dec = module.TransformerDecoder(**args)
+    dec = dec.to(device)
+
+    # decoding results must not depend on caching
+    dec.eval()
+    with torch.no_grad():
+        outs = []
+        for cache_states in [True, False]:
+            if params['recog_beam_width'] == 1:
+                hyps, _ = dec.greedy(eouts, elens, max_len_ratio=1.0, idx2token=None,
+                                     cache_states=cache_states)
+            else:
+                hyps, _, _ = dec.beam_search(eouts, elens, params, idx2token=None,
+                                             nbest=params['nbest'],
+                                             cache_states=cache_states)
+            outs.append(hyps)
+        for hyp_cache, hyp in zip(outs[0], outs[1]):
+            if params['recog_beam_width'] == 1:
+                assert np.array_equal(hyp_cache, hyp)
+            else:
+                for h_cache, h in zip(hyp_cache, hyp):
+                    assert np.array_equal(h_cache, h)
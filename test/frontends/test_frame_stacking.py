@@ -0,0 +1,35 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for frame stacking."""
+
+import numpy as np
+import pytest
+
+from neural_sp.models.seq2seq.frontends.frame_stacking import stack_frame
+
+
+@pytest.mark.parametrize(
+    "n_stacks, n_skips",
+    [
+        (1, 1),
+        (2, 1),
+        (2, 2),
+        (3, 1),
+        (3, 3),
+        (4, 3),
+    ]
+)
+def test_forward(n_stacks, n_skips):
+    xmax = 41
+    input_dim = 80
+
+    xs = np.random.randn(xmax, input_dim).astype(np.float32)
+    out = stack_frame(xs, n_stacks, n_skips)
+
+    T_new = xmax // n_skips if xmax % n_stacks == 0 else (xmax // n_skips) + 1
+    assert out.shape == (T_new, input_dim * n_stacks)
+    for t in range(T_new):
+        for i in range(n_stacks):
+            frame = xs[t * n_skips + i] if t * n_skips + i < xmax else np.zeros(input_dim)
+            assert np.array_equal(out[t, input_dim * i:input_dim * (i + 1)], frame)
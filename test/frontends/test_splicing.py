@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for splicing."""
+
+import numpy as np
+import pytest
+
+from neural_sp.models.seq2seq.frontends.splicing import splice
+
+
+@pytest.mark.parametrize(
+    "n_splices, n_stacks",
+    [
+        (1, 1),
+        (3, 1),
+        (5, 1),
+        (11, 1),
+        (3, 2),
+        (5, 3),
+    ]
+)
+def test_forward(n_splices, n_stacks):
+    xmax = 40
+    freq = 40
+    input_dim = freq * 3 * n_stacks
+
+    xs = np.random.randn(xmax, input_dim).astype(np.float32)
+    out = splice(xs, n_splices, n_stacks)
+
+    if n_splices == 1:
+        assert out is xs
+        return
+    assert out.shape == (xmax, freq * (n_splices * n_stacks) * 3)
+    out = out.reshape(xmax, freq, n_splices * n_stacks, 3)
+    # the last spliced frame of each time step is the previous frame (the first frame at t=0)
+    if n_stacks == 1:
+        for t in range(xmax):
+            frame = xs[max(t - 1, 0)].reshape(freq, 3)
+            assert np.array_equal(out[t, :, n_splices - 1], frame)
@@ -33,12 +33,6 @@ git clone https://github.com/kaldi-asr/kaldi.git tools/kaldi
 tar -xf ./ubuntu16-featbin.tar.gz
 cp featbin/* tools/kaldi/src/featbin/
 
-# install warp-ctc (use @jnishi patched version)
-git clone https://github.com/jnishi/warp-ctc.git -b pytorch-1.0.0
-cd warp-ctc && mkdir build && cd build && cmake .. && make -j4 && cd ..
-pip install cffi
-cd pytorch_binding && python setup.py install && cd ../..
-
 # install warp-transducer
 git clone https://github.com/HawkAaron/warp-transducer.git
 cd warp-transducer && mkdir build && cd build && cmake .. && make && cd ..
@@ -72,3 +72,26 @@ def test_forward(args):
     # assert loss.size(0) == 1
     assert loss.item() >= 0
     assert isinstance(observation, dict)
+
+
+@pytest.mark.parametrize(
+    "args", [
+        ({'lm_type': 'lstm', 'n_layers': 2}),
+        ({'lm_type': 'gru', 'n_layers': 2}),
+        ({'tie_embedding': True}),
+    ]
+)
+def test_forward_quantize(args):
+    args = make_args(**args)
+
+    ylens = [4, 5, 3, 7]
+    ys = [np.random.randint(0, VOCAB, ylen).astype(np.int64) for ylen in ylens]
+    device = "cpu"
+
+    module = importlib.import_module('neural_sp.models.lm.rnnlm')
+    lm = module.RNNLM(args)
+    lm = lm.to(device)
+    lm.quantize()
+    loss, state, observation = lm(ys, state=None, n_caches=0, is_eval=True)
+    assert loss.item() >= 0
+    assert isinstance(observation, dict)
@@ -63,3 +63,36 @@ def test_forward(args):
         cv, aws, _, _ = out
         assert cv.size() == (batch_size, 1, value.size(2))
         assert aws.size() == (batch_size, args['n_heads'], 1, klen)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ({'n_heads': 1}),
+        ({'n_heads': 4}),
+        ({'n_heads': 4, 'atype': 'add'}),
+    ]
+)
+def test_forward_broadcast_key(args):
+    args = make_args(**args)
+
+    batch_size = 4
+    klen = 40
+    qlen = 5
+    device = "cpu"
+
+    key = torch.randn(1, klen, args['kdim'], device=device)
+    query = torch.randn(batch_size, qlen, args['qdim'], device=device)
+
+    module = importlib.import_module('neural_sp.models.modules.multihead_attention')
+    attention = module.MultiheadAttentionMechanism(**args)
+    attention = attention.to(device)
+
+    attention.eval()
+    cv, aws, _, _ = attention(key, key, query, mask=None)
+    cv_rep, aws_rep, _, _ = attention(key.repeat([batch_size, 1, 1]), key.repeat([batch_size, 1, 1]),
+                                      query, mask=None)
+    assert cv.size() == (batch_size, qlen, args['odim'])
+    assert aws.size() == (batch_size, args['n_heads'], qlen, klen)
+    assert torch.allclose(cv, cv_rep, atol=1e-6)
+    assert torch.allclose(aws, aws_rep, atol=1e-6)
@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test for the attention-based sequence-to-sequence ASR model."""
+
+import numpy as np
+import pytest
+import torch
+
+from neural_sp.bin.args_asr import build_parser
+from neural_sp.bin.args_asr import register_args_decoder
+from neural_sp.bin.args_asr import register_args_encoder
+from neural_sp.models.seq2seq.speech2text import Speech2Text
+
+
+def make_args(**kwargs):
+    args = dict(
+        enc_type='blstm',
+        enc_n_units=16,
+        enc_n_projs=0,
+        enc_n_layers=1,
+        dec_type='lstm',
+        dec_n_units=16,
+        dec_n_layers=1,
+        emb_dim=16,
+        attn_dim=16,
+        n_freq_masks=0,
+        n_time_masks=0,
+        freq_width=3,
+        time_width=5,
+        input_noise_std=0,
+    )
+    args.update(kwargs)
+    argv = []
+    for k, v in args.items():
+        argv += ['--' + k, str(v)]
+
+    parser = build_parser()
+    args, _ = parser.parse_known_args(argv)
+    parser = register_args_encoder(parser, args)
+    args, _ = parser.parse_known_args(argv)
+    parser = register_args_decoder(parser, args)
+    args, _ = parser.parse_known_args(argv)
+    args.input_dim = 8
+    args.vocab = 10
+    args.vocab_sub1 = 0
+    args.vocab_sub2 = 0
+    return args
+
+
+def make_batch(xs_pad, xlens):
+    return {
+        'xs': [xs_pad[b, :xlens[b]] for b in range(len(xlens))],
+        'xs_pad': xs_pad,
+        'xlens': xlens,
+        'ys': [np.array([4, 5, 6], dtype=np.int32), np.array([7, 8], dtype=np.int32)],
+        'ys_sub1': [],
+        'ys_sub2': [],
+        'utt_ids': ['utt1', 'utt2'],
+    }
+
+
+@pytest.mark.parametrize(
+    "args, pin_memory",
+    [
+        ({'n_freq_masks': 1, 'n_time_masks': 1}, False),
+        ({'input_noise_std': 0.1}, False),
+        ({'n_freq_masks': 1, 'n_time_masks': 1, 'input_noise_std': 0.1}, False),
+        ({'n_freq_masks': 1, 'n_time_masks': 1, 'input_noise_std': 0.1}, True),
+    ]
+)
+def test_forward_keep_xs_pad(args, pin_memory):
+    args = make_args(**args)
+    model = Speech2Text(args, save_path=None)
+    model.train()
+
+    xlens = [30, 20]
+    xs_pad = np.random.randn(len(xlens), max(xlens), args.input_dim).astype(np.float32)
+    xs_pad_ref = xs_pad.copy()
+    batch = make_batch(xs_pad, xlens)
+    if pin_memory:
+        # same as mini-batches from Prefetcher(pin_memory=True)
+        batch['xs_pad'] = torch.from_numpy(xs_pad)
+        if torch.cuda.is_available():
+            batch['xs_pad'] = batch['xs_pad'].pin_memory()
+
+    loss, _ = model(batch, task='all')
+    assert torch.isfinite(loss).all()
+    # features padded by the dataset must not be modified by data augmentation
+    assert np.array_equal(np.asarray(batch['xs_pad']), xs_pad_ref)
+
+
+def test_encode_cached():
+    args = make_args()
+    model = Speech2Text(args, save_path=None)
+    model.eval()
+
+    xlens = [30, 20]
+    xs_pad = np.random.randn(len(xlens), max(xlens), args.input_dim).astype(np.float32)
+    batch = make_batch(xs_pad, xlens)
+    utt_ids = batch['utt_ids']
+
+    with torch.no_grad():
+        eout_dict = model.encode_cached(batch['xs'], 'ys', utt_ids)
+        # the same inputs of the same utterances
+        assert model.encode_cached(batch['xs'], 'ys', utt_ids) is eout_dict
+        # different inputs with colliding utterance IDs
+        xs_other = [x.copy() for x in batch['xs']]
+        assert model.encode_cached(xs_other, 'ys', utt_ids) is not eout_dict
+        eout_dict = model.encode_cached(xs_other, 'ys', utt_ids)
+        assert model.encode_cached(xs_other, 'ys', utt_ids) is eout_dict
+        # no cache without utterance IDs
+        assert model.encode_cached(xs_other, 'ys') is not eout_dict
+
+        # the cache is dropped when parameters can be updated
+        model(batch, task='all', is_eval=True)
+        assert model.encode_cached(xs_other, 'ys', utt_ids) is not eout_dict